@@ -0,0 +1,143 @@
+import argparse
+import io
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def corpus(n: int, size: int) -> list[tuple[str, str]]:
+    from corpus import generate, rawstmts
+
+    sqls = generate(n, size, kinds=("wide", "case"), unique=True)
+    return [(stmt.name, stmt.stmt) for stmt in rawstmts(sqls)]
+
+
+def checkout(rev: str, directory: str) -> str:
+    archive = subprocess.run(
+        ["git", "archive", rev, "src/pglineage"],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    return os.path.join(directory, "src")
+
+
+def measure(func) -> tuple[float, int]:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(src: str, path: str) -> None:
+    sys.path.insert(0, src)
+    from pglast import parse_sql
+
+    from pglineage import analyzer
+    from pglineage.analyzer import Analyzer
+    from pglineage.stmt import RawStmt
+
+    assert os.path.abspath(analyzer.__file__).startswith(os.path.abspath(src))
+    try:
+        from pglineage import metrics
+
+        metrics.PROGRESS = False
+    except ImportError:
+        pass
+    with open(path, "rb") as f:
+        stmts = [RawStmt(nm, sql) for nm, sql in pickle.load(f)]
+
+    def parse() -> None:
+        for stmt in stmts:
+            parse_sql(stmt.stmt)
+
+    def analyze() -> None:
+        analyzer = Analyzer()
+        analyzer.load(stmts)
+        results = analyzer.summarize()
+        assert len(results) == len(stmts)
+        assert not any(res.msg for res in results)
+
+    json.dump({"parse": measure(parse), "analyze": measure(analyze)}, sys.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=100)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument(
+        "--old",
+        help="git revision of the dict-based analyzer, "
+        "i.e. the parent of the commit that analyzes pglast AST nodes",
+    )
+    parser.add_argument(
+        "--new", default="", help="git revision to compare, the working tree if empty"
+    )
+    parser.add_argument("--run", nargs=2, metavar=("SRC", "CORPUS"), help="internal")
+    args = parser.parse_args()
+
+    if args.run:
+        run(*args.run)
+        return
+    if not args.old:
+        parser.error("--old is required")
+
+    stmts = corpus(args.n, args.size)
+    assert len({sql for _, sql in stmts}) == len(stmts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.pickle")
+        with open(path, "wb") as f:
+            pickle.dump(stmts, f)
+
+        res = {}
+        for label, src in (
+            ("old", checkout(args.old, os.path.join(tmp, "old"))),
+            (
+                "new",
+                (
+                    checkout(args.new, os.path.join(tmp, "new"))
+                    if args.new
+                    else os.path.join(ROOT, "src")
+                ),
+            ),
+        ):
+            out = subprocess.run(
+                [sys.executable, __file__, "--run", src, path],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            res[label] = json.loads(out)
+
+    print("statements (distinct)   :", len(stmts))
+    print("revisions (old / new)   :", args.old, "/", args.new or "working tree")
+    t, m = res["new"]["parse"]
+    print("parse only              : %8.3fs  peak %8.1f KiB" % (t, m / 1024))
+    for label in ("old", "new"):
+        t, m = res[label]["analyze"]
+        print("parse + analysis (%s)  : %8.3fs  peak %8.1f KiB" % (label, t, m / 1024))
+    t_old, m_old = res["old"]["analyze"]
+    t_new, m_new = res["new"]["analyze"]
+    print("speedup                 : %8.2fx" % (t_old / t_new))
+    print("peak memory ratio       : %8.2fx" % (m_old / m_new))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import time
+
+import graphviz as gv
+from pglineage import export
+from pglineage.column import Column
+from pglineage.edge import ColEdge, TblEdge
+from pglineage.lineage import Lineage
+from pglineage.table import Table
+
+
+def synthetic(tables: int, width: int, wide: int, wide_width: int) -> Lineage:
+    tbls: dict[str, Table] = {}
+    col_edges: set[ColEdge] = set()
+    tbl_edges: set[TblEdge] = set()
+    nodes: list[str] = []
+    prev = ""
+    for i in range(tables):
+        nm = "schema_" + str(i % 10) + ".table_" + str(i)
+        n = wide_width if i < wide else width
+        tbl = tbls[nm] = Table(nm)
+        tbl.update("col " + str(j) if j % 7 == 0 else "col_" + str(j) for j in range(n))
+        if not prev:
+            prev = nm
+            continue
+        stmt = "etl-" + str(i)
+        nodes.append(stmt)
+        tbl_edges.add(TblEdge(prev, stmt))
+        tbl_edges.add(TblEdge(stmt, nm))
+        for col in tbls[prev].columns:
+            if col in tbl.columns:
+                col_edges.add(ColEdge(Column(prev, col), Column(nm, col)))
+        prev = nm
+    return Lineage(tbls, col_edges, tbl_edges, set(), nodes)
+
+
+def digraph(lineage: Lineage) -> str:
+    dot = gv.Digraph()
+    dot.attr("graph", rankdir="LR")
+    dot.attr("node", fontname="MS Gothic")
+
+    used_tables = set()
+    for e in lineage.col_edges:
+        used_tables.add(e.head.table)
+        used_tables.add(e.tail.table)
+
+    for tbl in lineage.tables.values():
+        if tbl.name not in used_tables or not tbl.columns:
+            continue
+        label = ""
+        for col in tbl.columns:
+            sep = "|" if label else ""
+            label += sep + "<" + col + "> " + col
+        dot.node(tbl.name, shape="record", label=label, xlabel=tbl.name)
+
+    for edge in lineage.col_edges:
+        dot.edge(
+            edge.tail.table + ":" + edge.tail.name,
+            edge.head.table + ":" + edge.head.name,
+        )
+    return dot.source
+
+
+def emitter(lineage: Lineage) -> str:
+    return "".join(export.dot_lines(lineage, "column"))
+
+
+def measure(func, lineage: Lineage) -> tuple[float, int]:
+    start = time.perf_counter()
+    source = func(lineage)
+    return time.perf_counter() - start, len(source)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=5000)
+    parser.add_argument("--width", type=int, default=30)
+    parser.add_argument("--wide", type=int, default=20)
+    parser.add_argument("--wide-width", type=int, default=800)
+    args = parser.parse_args()
+
+    lineage = synthetic(args.tables, args.width, args.wide, args.wide_width)
+
+    t_gv, n_gv = measure(digraph, lineage)
+    t_em, n_em = measure(emitter, lineage)
+
+    print("tables                :", len(lineage.tables))
+    print("column edges          :", len(lineage.col_edges))
+    print("graphviz.Digraph      : %8.3fs  %10d bytes" % (t_gv, n_gv))
+    print("dot emitter           : %8.3fs  %10d bytes" % (t_em, n_em))
+    print("speedup               : %8.1fx" % (t_gv / t_em))
+
+
+if __name__ == "__main__":
+    main()
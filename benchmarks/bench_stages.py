@@ -0,0 +1,95 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import corpus
+import graphviz as gv
+from pglast import parse_sql
+from pglineage.analyzer import Analyzer
+from pglineage.lineage import Lineage
+from pglineage.reader import FileReader
+from pglineage.stmt import RawStmt
+
+
+def measure(func: Callable[[], Any]) -> tuple[float, int, Any]:
+    start = time.perf_counter()
+    res = func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, res
+
+
+def report(stage: str, n: int, elapsed: float, peak: int) -> None:
+    print(
+        "%-16s: %8.3fs %10.1f stmts/s  peak %10.1f KiB"
+        % (stage, elapsed, n / elapsed if elapsed else 0.0, peak / 1024)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=600)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--tables", type=int, default=100)
+    parser.add_argument("--kinds", nargs="+", choices=corpus.KINDS, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--draw", action="store_true")
+    args = parser.parse_args()
+
+    kinds = tuple(args.kinds) if args.kinds else tuple(corpus.KINDS)
+    sqls = corpus.generate(args.n, args.size, args.tables, kinds, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sql")
+        corpus.write(path, sqls)
+
+        reader = FileReader()
+        t, m, stmts = measure(lambda: reader.read(path))
+        n = len(stmts)
+        print("statements      :", n, "(" + ", ".join(kinds) + ")")
+        report("FileReader.read", n, t, m)
+
+        t, m, psdstmts = measure(
+            lambda: [parse_sql(stmt.stmt)[0].stmt for stmt in stmts]
+        )
+        report("parse_sql", n, t, m)
+
+        t, m, _ = measure(lambda: [ps(skip_none=True) for ps in psdstmts])
+        report("dict conversion", n, t, m)
+
+        def summarize() -> list[tuple[RawStmt, Any]]:
+            analyzer = Analyzer()
+            analyzer.load(
+                RawStmt(stmt.name, stmt.stmt, ps) for stmt, ps in zip(stmts, psdstmts)
+            )
+            return [
+                (res.rawstmt, res.summary)
+                for res in analyzer.summarize()
+                if res.summary
+            ]
+
+        t, m, summaries = measure(summarize)
+        report("analysis", n, t, m)
+
+        t, m, lineage = measure(lambda: Lineage.create(summaries))
+        report("Lineage.create", n, t, m)
+
+        if args.draw:
+            output = os.path.join(tmp, "result")
+            try:
+                t, m, _ = measure(lambda: lineage.draw(output, "svg"))
+            except gv.ExecutableNotFound:
+                print("draw            : skipped (dot not found)")
+            else:
+                report("draw", n, t, m)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import itertools
+import random
+from typing import Callable
+
+from pglineage.stmt import RawStmt
+
+
+def cols(prefix: str, width: int) -> list[str]:
+    return [prefix + str(i) for i in range(width)]
+
+
+def cte_chain(tgt: str, src: str, depth: int, width: int = 4) -> str:
+    cs = ", ".join(cols("c", width))
+    ctes = ["q0 as (select " + cs + " from " + src + ")"]
+    for i in range(1, depth):
+        ctes.append("q" + str(i) + " as (select " + cs + " from q" + str(i - 1) + ")")
+    return (
+        "insert into " + tgt + " (" + cs + ") with " + ", ".join(ctes) + " "
+        "select " + cs + " from q" + str(depth - 1) + ";"
+    )
+
+
+def wide_insert(tgt: str, src: str, width: int) -> str:
+    return (
+        "insert into " + tgt + " (" + ", ".join(cols("c", width)) + ") "
+        "select " + ", ".join(cols("s.c", width)) + " from " + src + " s "
+        "join dim d on s.id = d.id where exists (select 1 from flt f where f.id = s.id);"
+    )
+
+
+def many_joins(tgt: str, srcs: list[str]) -> str:
+    exprs = ", ".join("j" + str(i) + ".v" for i in range(len(srcs)))
+    joins = srcs[0] + " j0"
+    for i, src in enumerate(srcs[1:], 1):
+        joins += " join " + src + " j" + str(i) + " on j0.id = j" + str(i) + ".id"
+    return (
+        "insert into " + tgt + " (" + ", ".join(cols("c", len(srcs))) + ") "
+        "select " + exprs + " from " + joins + ";"
+    )
+
+
+def big_case(tgt: str, src: str, arms: int) -> str:
+    whens = " ".join("when a.k = " + str(i) + " then b.v" + str(i) for i in range(arms))
+    return (
+        "insert into " + tgt + " (v) select case " + whens + " "
+        "else (select max(z) from zz) end from " + src + " a join b on a.id = b.id;"
+    )
+
+
+def union_tree(tgt: str, srcs: list[str]) -> str:
+    return (
+        "insert into "
+        + tgt
+        + " (a, b) "
+        + " union ".join("select a, b from " + src for src in srcs)
+        + ";"
+    )
+
+
+def correlated(tgt: str, src: str, refs: list[str]) -> str:
+    conds = []
+    for i, ref in enumerate(refs):
+        r = "r" + str(i)
+        if i % 2:
+            conds.append(
+                "s.b in (select " + r + ".b from " + ref + " " + r + " "
+                "where " + r + ".k = s.k)"
+            )
+        else:
+            conds.append(
+                "exists (select 1 from " + ref + " " + r + " "
+                "where " + r + ".id = s.id)"
+            )
+    return (
+        "insert into " + tgt + " (a, b) select s.a, s.b from " + src + " s "
+        "where " + " and ".join(conds) + ";"
+    )
+
+
+KINDS: dict[str, Callable[[Callable[[], str], int], str]] = {
+    "cte": lambda tbl, size: cte_chain(tbl(), tbl(), size),
+    "wide": lambda tbl, size: wide_insert(tbl(), tbl(), size * 10),
+    "joins": lambda tbl, size: many_joins(tbl(), [tbl() for _ in range(size)]),
+    "case": lambda tbl, size: big_case(tbl(), tbl(), size * 10),
+    "union": lambda tbl, size: union_tree(tbl(), [tbl() for _ in range(size)]),
+    "correlated": lambda tbl, size: correlated(
+        tbl(), tbl(), [tbl() for _ in range(size)]
+    ),
+}
+
+
+def generate(
+    n: int,
+    size: int = 10,
+    tables: int = 100,
+    kinds: tuple[str, ...] = tuple(KINDS),
+    seed: int = 0,
+    unique: bool = False,
+) -> list[str]:
+    rng = random.Random(seed)
+    names = itertools.count()
+
+    def tbl() -> str:
+        return "t" + str(next(names) if unique else rng.randrange(tables))
+
+    return [KINDS[kinds[i % len(kinds)]](tbl, size) for i in range(n)]
+
+
+def rawstmts(sqls: list[str], name: str = "bench") -> list[RawStmt]:
+    return [RawStmt(name + "-" + str(i + 1), sql) for i, sql in enumerate(sqls)]
+
+
+def write(path: str, sqls: list[str]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for sql in sqls:
+            f.write(sql + "\n\n")
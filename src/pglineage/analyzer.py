@@ -1,107 +1,312 @@
-import builtins
-from typing import Any, Tuple
+import cProfile
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, NamedTuple, Tuple
 
-import tqdm
 from pglast import ast, parse_sql
+from pglast.enums import CmdType, SetOperation
 from pglineage import node
+from pglineage.cache import Cache
+from pglineage.catalog import Catalog
 from pglineage.column import Column
 from pglineage.lineage import Lineage
 from pglineage.logger import Logger
+from pglineage.metrics import Metrics, progress
 from pglineage.stmt import RawStmt
 
-logger = Logger()
 
+class Result(NamedTuple):
+    rawstmt: RawStmt
+    summary: node.Summary | None
+    msg: str
+    unexpanded: int = 0
+    elapsed: float = 0.0
+    depth: int = 0
+    error: str = ""
 
-class Analyzer:
-    def __init__(self) -> None:
-        self.__rawstmts: list[RawStmt] = []
-        self.__psdstmts: list[
-            ast.SelectStmt | ast.InsertStmt | ast.UpdateStmt | ast.DeleteStmt
-        ] = []
 
-    def load(self, stmts: list[RawStmt]) -> None:
-        for stmt in stmts:
-            self.__rawstmts.append(stmt)
-            logger.set("success", "", stmt)
+def _analyze_chunk(
+    rawstmts: list[RawStmt], profile: str = "", catalog: Catalog | None = None
+) -> list[Result]:
+    analyzer = Analyzer(Metrics(profile=profile) if profile else None, catalog=catalog)
+    return [analyzer._summarize(rawstmt) for rawstmt in rawstmts]
 
-    def __parse(self) -> None:
-        for rawstmt in tqdm.tqdm(self.__rawstmts, desc="parsing", leave=False):
-            try:
-                psdstmt = next(iter(parse_sql(rawstmt.stmt))).stmt
-                self.__psdstmts.append(psdstmt)
-            except Exception as e:
-                self.__psdstmts.append(None)
-                logger.set("failed", str(e), rawstmt)
-                continue
 
-    def analyze(self) -> Lineage:
-        self.__parse()
-        return Lineage.create(self.__analyze())
-
-    def _analyze_test(self) -> node.Node:
-        self.__parse()
-        return self.__analyze()[0][2]
+class Analyzer:
+    __CHUNK = 64
 
-    def __analyze(self) -> list[Tuple[str, str, node.Node]]:
-        nodes: list[Tuple[str, node.Node]] = []
-        for psdstmt, rawstmt in zip(
-            tqdm.tqdm(self.__psdstmts, desc="analyzing", leave=False), self.__rawstmts
-        ):
-            match psdstmt:
-                case ast.SelectStmt():
-                    analyze_stmt = self.__analyze_select
-                case ast.InsertStmt():
-                    analyze_stmt = self.__analyze_insert
-                case ast.UpdateStmt():
-                    analyze_stmt = self.__analyze_update
-                case ast.DeleteStmt():
-                    analyze_stmt = self.__analyze_delete
-                case _:
-                    continue
-            try:
-                nd = (
-                    rawstmt,
-                    analyze_stmt(psdstmt(skip_none=True)),
+    def __init__(
+        self,
+        metrics: Metrics | None = None,
+        logger: Logger | None = None,
+        catalog: Catalog | None = None,
+    ) -> None:
+        self.__rawstmts: list[RawStmt] = []
+        self.__metrics = metrics
+        self.__logger = logger if logger else Logger()
+        self.__catalog = catalog
+        self.__observed: dict[str, dict[str, None]] = {}
+        self.__unexpanded = 0
+        self.__profile = metrics.profile if metrics else ""
+        self.__depth = 0
+        self.__max_depth = 0
+
+    @property
+    def logger(self) -> Logger:
+        return self.__logger
+
+    def load(self, stmts: Iterable[RawStmt]) -> None:
+        self.__rawstmts.extend(stmts)
+
+    def __parse(self, rawstmt: RawStmt) -> ast.Node:
+        if rawstmt.psdstmt is not None:
+            return rawstmt.psdstmt
+        return next(iter(parse_sql(rawstmt.stmt))).stmt
+
+    def analyze(
+        self,
+        workers: int = 1,
+        cache: Cache | None = None,
+        compact: bool = False,
+        stream: Iterable[Iterable[RawStmt]] = (),
+    ) -> Lineage:
+        results = self.summarize(workers, cache, stream)
+        return Lineage.create(
+            [(res.rawstmt, res.summary) for res in results if res.summary],
+            compact,
+            self.__metrics,
+            self.__logger,
+        )
+
+    def summarize(
+        self,
+        workers: int = 1,
+        cache: Cache | None = None,
+        stream: Iterable[Iterable[RawStmt]] = (),
+    ) -> list[Result]:
+        metrics = self.__metrics if self.__metrics else Metrics(0)
+        results: list[Result | None] = []
+        first: dict[str, int] = {}
+        unique: list[int] = []
+        duplicates: list[int] = []
+        computed: list[Result] = []
+        chunk: list[RawStmt] = []
+        futures: deque[Future[list[Result]]] = deque()
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        bar = progress(desc="analyzing")
+
+        def submit() -> None:
+            futures.append(
+                executor.submit(
+                    _analyze_chunk, list(chunk), self.__profile, self.__catalog
                 )
-                nodes.append(nd)
+            )
+            chunk.clear()
+
+        def collect(limit: int) -> None:
+            while len(futures) > limit:
+                res = futures.popleft().result()
+                computed.extend(res)
+                bar.update(len(res))
+
+        def add(rawstmt: RawStmt) -> None:
+            i = len(results)
+            hit = cache.get(rawstmt) if cache else None
+            results.append(Result(rawstmt, *hit) if hit else None)
+            if hit:
+                return
+            if first.setdefault(Cache.normalize(rawstmt.stmt), i) != i:
+                duplicates.append(i)
+                return
+            unique.append(i)
+            if executor:
+                chunk.append(rawstmt)
+                if len(chunk) >= Analyzer.__CHUNK:
+                    submit()
+                    collect(workers * 2)
+            else:
+                computed.append(self._summarize(rawstmt))
+                bar.update(1)
 
-            except Exception as e:
-                logger.set("failed", str(e), rawstmt)
+        with metrics.stage("analyzing"):
+            try:
+                for rawstmt in self.__rawstmts:
+                    add(rawstmt)
+                for stmts in stream:
+                    for rawstmt in stmts:
+                        self.__rawstmts.append(rawstmt)
+                        add(rawstmt)
+                if chunk:
+                    submit()
+                collect(0)
+            finally:
+                if executor:
+                    executor.shutdown(cancel_futures=True)
+                bar.close()
+
+        for i, res in zip(unique, computed):
+            results[i] = res
+            metrics.statement(res.rawstmt.name, res.elapsed, res.depth, res.error)
+        for i in duplicates:
+            rawstmt = self.__rawstmts[i]
+            rep = results[first[Cache.normalize(rawstmt.stmt)]]
+            results[i] = self.__reuse(rep, rawstmt)
+        metrics.duplicates += len(duplicates)
+        if cache:
+            with metrics.stage("cache"):
+                cache.put(computed)
+
+        with metrics.stage("expanding"):
+            self.__expand(results)
+
+        for res in results:
+            self.__logger.set("failed" if res.msg else "success", res.msg, res.rawstmt)
+
+        return results
+
+    def __reuse(self, res: Result, rawstmt: RawStmt) -> Result:
+        summary = (
+            res.summary.rename(res.rawstmt.name, rawstmt.name) if res.summary else None
+        )
+        return res._replace(rawstmt=rawstmt, summary=summary, elapsed=0.0)
+
+    def __observe(self, results: list[Result]) -> dict[str, dict[str, None]]:
+        observed: dict[str, dict[str, None]] = {}
+        for res in results:
+            if not res.summary or res.unexpanded:
                 continue
+            for tbl in res.summary.tgt_tbl.values():
+                observed.setdefault(tbl.name, {}).update(tbl.columns)
+            for tbl in res.summary.src_tbls.values():
+                observed.setdefault(tbl.name, {}).update(tbl.columns)
+        return observed
+
+    def __expand(self, results: list[Result]) -> None:
+        pending = [i for i, res in enumerate(results) if res.unexpanded]
+        while pending:
+            self.__observed = self.__observe(results)
+            improved: list[int] = []
+            retried: dict[str, Result] = {}
+            for i in pending:
+                rawstmt = results[i].rawstmt
+                k = Cache.normalize(rawstmt.stmt)
+                if k in retried:
+                    res = self.__reuse(retried[k], rawstmt)
+                else:
+                    res = retried[k] = self._summarize(rawstmt)
+                if res.unexpanded < results[i].unexpanded:
+                    results[i] = res
+                    if res.unexpanded:
+                        improved.append(i)
+            pending = improved
+        self.__observed = {}
 
-        return nodes
+    def _analyze_test(self) -> node.Node:
+        return self.__analyze(self.__parse(self.__rawstmts[0]))
+
+    def _summarize(self, rawstmt: RawStmt) -> Result:
+        self.__depth = self.__max_depth = self.__unexpanded = 0
+        profiler = cProfile.Profile() if self.__profile else None
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            psdstmt = self.__parse(rawstmt)
+            nd = self.__analyze(psdstmt)
+            summary = nd.summary(rawstmt.name) if nd else None
+        except Exception as e:
+            summary, msg, error = None, str(e), type(e).__name__
+        else:
+            msg, error = "", ""
+        finally:
+            if profiler:
+                profiler.disable()
+        elapsed = time.perf_counter() - start
+        if profiler:
+            os.makedirs(self.__profile, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.__profile, rawstmt.name + ".prof"))
+        return Result(
+            rawstmt,
+            summary,
+            msg,
+            self.__unexpanded,
+            elapsed,
+            self.__max_depth,
+            error,
+        )
+
+    def __analyze(self, psdstmt: ast.Node) -> node.Node | None:
+        match psdstmt:
+            case ast.SelectStmt():
+                analyze_stmt = self.__analyze_select
+            case ast.InsertStmt():
+                analyze_stmt = self.__analyze_insert
+            case ast.UpdateStmt():
+                analyze_stmt = self.__analyze_update
+            case ast.DeleteStmt():
+                analyze_stmt = self.__analyze_delete
+            case ast.MergeStmt():
+                analyze_stmt = self.__analyze_merge
+            case ast.CreateTableAsStmt():
+                analyze_stmt = self.__analyze_createtableas
+            case _:
+                return None
+        return analyze_stmt(psdstmt)
+
+    def __values(self, nd: ast.Node) -> Iterator[Any]:
+        for attr in nd.__slots__:
+            v = getattr(nd, attr)
+            if v is not None:
+                yield v
+
+    def __relname(self, rv: ast.RangeVar) -> str:
+        name = rv.schemaname + "." + rv.relname if rv.schemaname else rv.relname
+        if self.__catalog:
+            return self.__catalog.qualify(name)
+        return rv.relname if rv.schemaname == "public" else name
+
+    def __from_aliases(self, fc: ast.Node, aliases: list[str | None]) -> None:
+        match fc:
+            case ast.RangeVar():
+                aliases.append(fc.alias.aliasname if fc.alias else fc.relname)
+            case ast.RangeSubselect():
+                aliases.append(fc.alias.aliasname)
+            case ast.JoinExpr():
+                self.__from_aliases(fc.larg, aliases)
+                self.__from_aliases(fc.rarg, aliases)
+            case _:
+                aliases.append(None)
 
     def __analyze_fromclause(
-        self, fc: dict[str, Any], tables: dict[str, str | node.Select]
+        self, fc: ast.Node, tables: dict[str, str | node.Select]
     ) -> None:
-        if "@" not in fc.keys():
+        if not isinstance(fc, ast.Node):
             return
 
-        if fc["@"] == "RangeSubselect":
-            tables[fc["alias"]["aliasname"]] = self.__analyze_select(fc["subquery"])
+        if isinstance(fc, ast.RangeSubselect):
+            tables[fc.alias.aliasname] = self.__analyze_select(fc.subquery)
 
-        elif fc["@"] == "RangeVar":
-            tblnm = fc["alias"]["aliasname"] if "alias" in fc.keys() else fc["relname"]
-            tables.setdefault(tblnm, fc["relname"])
+        elif isinstance(fc, ast.RangeVar):
+            tblnm = fc.alias.aliasname if fc.alias else fc.relname
+            cte = fc.relname in tables and not fc.schemaname
+            tables.setdefault(tblnm, fc.relname if cte else self.__relname(fc))
 
-        for v in fc.values():
-            if isinstance(v, dict):
+        for v in self.__values(fc):
+            if isinstance(v, ast.Node):
                 self.__analyze_fromclause(v, tables)
 
     def __analyze_usingclause(
-        self, uc: dict[str, Any], tables: dict[str, str | node.Select]
+        self, uc: ast.Node, tables: dict[str, str | node.Select]
     ) -> None:
-        if "@" not in uc.keys():
-            return
-
-        match uc["@"]:
-            case "RangeVar":
-                alias = uc["alias"]["aliasname"] if "alias" in uc.keys() else ""
-                relname = uc["relname"]
-                tables[alias if alias else relname] = relname
-            case "RangeSubselect":
-                alias = uc["alias"]["aliasname"]
-                tables[alias] = self.__analyze_select(uc["subquery"])
+        match uc:
+            case ast.RangeVar():
+                alias = uc.alias.aliasname if uc.alias else ""
+                tables[alias if alias else uc.relname] = self.__relname(uc)
+            case ast.RangeSubselect():
+                alias = uc.alias.aliasname
+                tables[alias] = self.__analyze_select(uc.subquery)
         return
 
     def __merge_tables(
@@ -113,49 +318,141 @@ class Analyzer:
             elif isinstance(sv, str):
                 fst.setdefault(sk, sv)
 
+    def __union(
+        self, fst: dict[str, list[Column]], snd: dict[str, list[Column]]
+    ) -> None:
+        for k, cols in snd.items():
+            fst[k] = list(dict.fromkeys(fst.get(k, []) + cols))
+
     def __analyze_whereclause(
-        self, wc: dict[str, Any], tables: dict[str, str | node.Select]
+        self, wc: ast.Node, tables: dict[str, str | node.Select]
     ) -> None:
-        if "@" not in wc.keys():
+        if not isinstance(wc, ast.Node):
             return
 
-        if wc["@"] == "SelectStmt":
+        if isinstance(wc, ast.SelectStmt):
             _tbls = self.__analyze_select(wc)._flatten().tables
             self.__merge_tables(tables, _tbls)
             return
 
-        for v in wc.values():
-            if isinstance(v, dict):
+        for v in self.__values(wc):
+            if isinstance(v, ast.Node):
                 self.__analyze_whereclause(v, tables)
             elif isinstance(v, tuple):
                 for vv in v:
                     self.__analyze_whereclause(vv, tables)
 
+    def __columns(self, tbl: str | node.Select | None) -> Iterable[str] | None:
+        if isinstance(tbl, node.Select):
+            return tbl.srccols.keys()
+        if not isinstance(tbl, str):
+            return None
+        cols = self.__catalog.columns(tbl) if self.__catalog else None
+        return cols if cols is not None else self.__observed.get(tbl)
+
+    def __is_star(self, tgt: ast.ResTarget) -> bool:
+        return isinstance(tgt.val, ast.ColumnRef) and isinstance(
+            tgt.val.fields[-1], ast.A_Star
+        )
+
+    def __expand_star(
+        self,
+        tgt: ast.ResTarget,
+        tables: dict[str, str | node.Select],
+        aliases: list[str | None],
+    ) -> list[Tuple[str, str]] | None:
+        names = [f.sval for f in tgt.val.fields[:-1]]
+        res: list[Tuple[str, str]] = []
+        for alias in names[-1:] if names else aliases:
+            tbl = tables.get(alias) if alias else None
+            if isinstance(tbl, str) and isinstance(tables.get(tbl), node.Select):
+                tbl = tables[tbl]
+            cols = self.__columns(tbl)
+            if cols is None:
+                return None
+            res.extend((alias, col) for col in cols)
+        return res
+
+    def __resolve_columns(
+        self,
+        tables: dict[str, str | node.Select],
+        *colss: dict[str, list[Column]],
+    ) -> None:
+        owners: dict[str, list[str]] = {}
+        for alias, tbl in tables.items():
+            for col in self.__columns(tbl) or ():
+                owners.setdefault(col, []).append(alias)
+
+        for cols in colss:
+            for cs in cols.values():
+                cs[:] = [
+                    (
+                        c.with_table(owners[c.name][0])
+                        if len(owners.get(c.name, ())) == 1
+                        else c
+                    )
+                    for c in cs
+                ]
+
+    def __set_table(self, table: str, *colss: dict[str, list[Column]]) -> None:
+        for cols in colss:
+            for cs in cols.values():
+                cs[:] = [c.with_table(table) for c in cs]
+
+    def __resolve_unqualified(
+        self,
+        scope: dict[str, str | node.Select],
+        default: str,
+        *colss: dict[str, list[Column]],
+    ) -> None:
+        if self.__catalog or self.__observed:
+            self.__resolve_columns(scope, *colss)
+        if default:
+            self.__set_table(default, *colss)
+
     def __analyze_restargets(
-        self, restargets: list[dict[str, Any]]
+        self,
+        restargets: Tuple[ast.ResTarget, ...],
+        scope: dict[str, str | node.Select] | None = None,
+        aliases: list[str | None] | None = None,
     ) -> Tuple[
         dict[str, list[Column]], dict[str, list[Column]], dict[str, str | node.Select]
     ]:
+        scope = {} if scope is None else scope
         srcs: dict[str, list[Column]] = {}
         refs: dict[str, list[Column]] = {}
         tables: dict[str, str | node.Select] = {}
 
         for i, tgt in enumerate(restargets):
-            if tgt.get("@", "") != "ResTarget":
+            if not isinstance(tgt, ast.ResTarget):
                 Exception()
 
+            if aliases and self.__is_star(tgt):
+                star = self.__expand_star(tgt, scope, aliases)
+                if star is None:
+                    self.__unexpanded += 1
+                else:
+                    for alias, col in star:
+                        n = sum(
+                            1 for nm in srcs if nm == col or nm.startswith(col + "(")
+                        )
+                        name = col + "(" + str(n + 1) + ")" if n else col
+                        srcs[name] = [Column(alias, col)]
+                        refs[name] = []
+                    continue
+
             srccols: list[Column] = []
             refcols: list[Column] = []
 
-            for v in tgt.values():
+            for v in self.__values(tgt):
                 if isinstance(v, tuple):
                     for vv in v:
                         self.__analyze_restarget(vv, srccols, refcols, tables)
                 else:
                     self.__analyze_restarget(v, srccols, refcols, tables)
 
-            name = tgt.get(
-                "name", srccols[0].name if len(srccols) == 1 else "column-" + str(i + 1)
+            name = tgt.name or (
+                srccols[0].name if len(srccols) == 1 else "column-" + str(i + 1)
             )
             ls = [nm for nm in srcs.keys() if nm.startswith(name)]
             name += "(" + str(len(ls) + 1) + ")" if len(ls) else ""
@@ -165,7 +462,7 @@ class Analyzer:
         return srcs, refs, tables
 
     def __analyze_valueslist(
-        self, valuelist: Tuple[dict[str, Any]]
+        self, valuelist: Tuple[ast.Node, ...]
     ) -> Tuple[
         dict[str, list[Column]], dict[str, list[Column]], dict[str, str | node.Select]
     ]:
@@ -174,23 +471,21 @@ class Analyzer:
         tables: dict[str, str | node.Select] = {}
 
         for i, v in enumerate(valuelist):
-            if not isinstance(v, dict):
-                raise Exception()
-            if "@" not in v.keys():
+            if not isinstance(v, ast.Node):
                 raise Exception()
 
             scs: list[Column] = []
             rcs: list[Column] = []
             tbls: list[str] = []
-            match v["@"]:
-                case "CaseExpr":
+            match v:
+                case ast.CaseExpr():
                     scs, rcs, _tbls = self.__extract_caseexpr(v)
                     tbls = list(_tbls.values())
-                case "SelectStmt":
+                case ast.SelectStmt():
                     res = self.__analyze_select(v)._flatten()
                     scs, rcs, tbls = (
-                        next(iter(res.srccols.values())),
-                        next(iter(res.refcols.values())),
+                        list(next(iter(res.srccols.values()))),
+                        list(next(iter(res.refcols.values()))),
                         list(res.tables.values()),
                     )
                 case _:
@@ -202,7 +497,7 @@ class Analyzer:
         return srccols, refcols, tables
 
     def __analyze_valueslists(
-        self, valueslists: Tuple[Tuple[dict[str, Any]]]
+        self, valueslists: Tuple[Tuple[ast.Node, ...], ...]
     ) -> Tuple[
         dict[str, list[Column]], dict[str, list[Column]], dict[str, str | node.Select]
     ]:
@@ -218,40 +513,35 @@ class Analyzer:
 
         return srccols, refcols, tables
 
-    def __traverse(self, key, tgt, types: list[str]):
-        match type(tgt):
-            case builtins.dict:
-                if tgt.get("@", "") in types:
-                    yield key, tgt
-                    return
-                for k, v in tgt.items():
-                    yield from self.__traverse(k, v, types)
-            case builtins.tuple:
-                for v in tgt:
-                    if isinstance(v, (tuple, dict)):
-                        yield from self.__traverse("", v, types)
+    def __traverse(self, tgt, types: Tuple[type, ...]) -> Iterator[ast.Node]:
+        if isinstance(tgt, ast.Node):
+            if isinstance(tgt, types):
+                yield tgt
+                return
+            for v in self.__values(tgt):
+                yield from self.__traverse(v, types)
+        elif isinstance(tgt, tuple):
+            for v in tgt:
+                yield from self.__traverse(v, types)
 
     def __extract_caseexpr(
-        self, tgt
+        self, tgt: ast.CaseExpr
     ) -> Tuple[list[Column], list[Column], dict[str, str | node.Select]]:
         srccols: list[Column] = []
         refcols: list[Column] = []
         tables: dict[str, str | node.Select] = {}
 
-        arg = tgt.get("arg", {})
-        if arg.get("@", "") == "ColumnRef":
-            col = self.__collect_column(arg)
+        if isinstance(tgt.arg, ast.ColumnRef):
+            col = self.__collect_column(tgt.arg)
             if col:
                 refcols.append(col)
 
-        TYPES = ["SelectStmt", "ColumnRef"]
-        args = tgt.get("args", ())
-        for arg in args:
-            if arg["@"] == "CaseWhen":
-                for next_tgt in self.__traverse("expr", arg["expr"], TYPES):
-                    nt = next_tgt[1]
-                    match nt.get("@", ""):
-                        case "SelectStmt":
+        TYPES = (ast.SelectStmt, ast.ColumnRef)
+        for arg in tgt.args or ():
+            if isinstance(arg, ast.CaseWhen):
+                for nt in self.__traverse(arg.expr, TYPES):
+                    match nt:
+                        case ast.SelectStmt():
                             stmt = self.__analyze_select(nt)._flatten()
                             for sc, rc in zip(
                                 stmt.srccols.values(), stmt.refcols.values()
@@ -260,15 +550,14 @@ class Analyzer:
                                 refcols.extend(rc)
                             self.__merge_tables(tables, stmt.tables)
 
-                        case "ColumnRef":
+                        case ast.ColumnRef():
                             col = self.__collect_column(nt)
                             if col:
                                 refcols.append(col)
 
-                for next_tgt in self.__traverse("result", arg["result"], TYPES):
-                    nt = next_tgt[1]
-                    match nt.get("@", ""):
-                        case "SelectStmt":
+                for nt in self.__traverse(arg.result, TYPES):
+                    match nt:
+                        case ast.SelectStmt():
                             stmt = self.__analyze_select(nt)._flatten()
                             for sc, rc in zip(
                                 stmt.srccols.values(), stmt.refcols.values()
@@ -277,51 +566,42 @@ class Analyzer:
                                 refcols.extend(rc)
                             self.__merge_tables(tables, stmt.tables)
 
-                        case "ColumnRef":
+                        case ast.ColumnRef():
                             col = self.__collect_column(nt)
                             if col:
                                 srccols.append(col)
 
-        defresult = tgt.get("defresult", {})
-        for next_tgt in self.__traverse("defresult", defresult, TYPES):
-            nt = next_tgt[1]
-            match nt.get("@", ""):
-                case "SelectStmt":
+        for nt in self.__traverse(tgt.defresult, TYPES):
+            match nt:
+                case ast.SelectStmt():
                     stmt = self.__analyze_select(nt)._flatten()
                     for sc, rc in zip(stmt.srccols.values(), stmt.refcols.values()):
                         srccols.extend(sc)
                         refcols.extend(rc)
                     self.__merge_tables(tables, stmt.tables)
 
-                case "ColumnRef":
+                case ast.ColumnRef():
                     col = self.__collect_column(nt)
                     if col:
                         srccols.append(col)
 
         return list(set(srccols)), list(set(refcols)), tables
 
-    def __collect_column(self, tgt) -> Column | None:
-        if "fields" not in tgt:
-            return None
-
-        col = []
-        for field in tgt["fields"]:
-            if "sval" in field.keys():
-                col.append(field["sval"])
-
+    def __collect_column(self, tgt: ast.ColumnRef) -> Column | None:
+        col = [field.sval for field in tgt.fields if isinstance(field, ast.String)]
         return Column.create_from_list(col) if col else None
 
     def __analyze_multiassignref(
-        self, tgt: dict[str, Any]
+        self, tgt: ast.MultiAssignRef
     ) -> Tuple[
         dict[str, list[Column]], dict[str, list[Column]], dict[str, str | node.Select]
     ]:
         srccols: dict[str, list[Column]] = {}
         refcols: dict[str, list[Column]] = {}
 
-        colno = int(tgt["colno"])
-        subselect = next(iter(self.__traverse("source", tgt["source"], ["SelectStmt"])))
-        subselect = self.__analyze_select(subselect[1])._flatten()
+        colno = tgt.colno
+        subselect = next(iter(self.__traverse(tgt.source, (ast.SelectStmt,))))
+        subselect = self.__analyze_select(subselect)._flatten()
         k = "column-" + str(colno)
         for i, (scs, rcs) in enumerate(
             zip(subselect.srccols.values(), subselect.refcols.values())
@@ -335,32 +615,31 @@ class Analyzer:
 
     def __analyze_restarget(
         self,
-        tgt: dict[str, Any],
+        tgt: ast.Node,
         srccols: list[Column],
         refcols: list[Column],
         tables: dict[str, str | node.Select],
     ) -> None:
-        if not isinstance(tgt, dict):
+        if not isinstance(tgt, ast.Node):
             return None
 
-        TYPES = ["ColumnRef", "SelectStmt", "CaseExpr", "MultiAssignRef"]
-        for rt in self.__traverse("ResTarget", tgt, TYPES):
-            t = rt[1]
-            match t.get("@", ""):
-                case "MultiAssignRef":
+        TYPES = (ast.ColumnRef, ast.SelectStmt, ast.CaseExpr, ast.MultiAssignRef)
+        for t in self.__traverse(tgt, TYPES):
+            match t:
+                case ast.MultiAssignRef():
                     scs, rcs, tbls = self.__analyze_multiassignref(t)
                     srccols.extend(next(iter(scs.values())))
                     refcols.extend(next(iter(rcs.values())))
                     self.__merge_tables(tables, tbls)
                     return
 
-                case "ColumnRef":
+                case ast.ColumnRef():
                     col = self.__collect_column(t)
                     if col:
                         srccols.append(col)
                     return
 
-                case "SelectStmt":
+                case ast.SelectStmt():
                     stmt = self.__analyze_select(t)._flatten()
                     for sc in stmt.srccols.values():
                         srccols.extend(sc)
@@ -369,24 +648,25 @@ class Analyzer:
                     self.__merge_tables(tables, stmt.tables)
                     return
 
-                case "CaseExpr":
+                case ast.CaseExpr():
                     res = self.__extract_caseexpr(t)
                     srccols.extend(res[0])
                     refcols.extend(res[1])
                     self.__merge_tables(tables, res[2])
                     return
 
-    def __extract_cte(self, wc: dict[str, Any]) -> node.Select:
-        cte = self.__analyze_select(wc["ctequery"])
-        if "aliascolnames" in wc.keys():
+    def __extract_cte(self, wc: ast.CommonTableExpr) -> node.Select:
+        cte = self.__analyze_select(wc.ctequery)
+        if wc.aliascolnames:
             cte.srccols = {
-                colalias["sval"]: srccols
-                for colalias, srccols in zip(wc["aliascolnames"], cte.srccols.values())
+                colalias.sval: srccols
+                for colalias, srccols in zip(wc.aliascolnames, cte.srccols.values())
             }
             cte.refcols = {
-                colalias["sval"]: refcols
-                for colalias, refcols in zip(wc["aliascolnames"], cte.refcols.values())
+                colalias.sval: refcols
+                for colalias, refcols in zip(wc.aliascolnames, cte.refcols.values())
             }
+            cte._invalidate()
         return cte
 
     def __remove_cycleref(self, nd: node.Select, ctename: str) -> None:
@@ -399,17 +679,27 @@ class Analyzer:
             colname: [rc for rc in refcols if rc.table != ctename]
             for colname, refcols in nd.refcols.items()
         }
+        nd._invalidate()
 
     def __attach_node_to_table(self, tables: dict[str, str | node.Select]):
         nodes: dict[str, node.Select] = {}
+        collected: set[int] = set()
+        attached: set[int] = set()
 
         def collect_nodes(nd: node.Select):
+            if id(nd) in collected:
+                return
+            collected.add(id(nd))
             for k, v in nd.tables.items():
                 if isinstance(v, node.Select):
                     nodes.setdefault(k, v)
                     collect_nodes(v)
 
         def attach_nodes(nd: node.Select):
+            if id(nd) in attached:
+                return
+            attached.add(id(nd))
+            nd._invalidate()
             for k, v in nd.tables.items():
                 if isinstance(v, str):
                     if v in nodes.keys():
@@ -431,27 +721,35 @@ class Analyzer:
 
         return nodes
 
-    def __analyze_withclause(self, wc) -> dict[str, node.Select]:
+    def __analyze_withclause(self, wc: ast.WithClause) -> dict[str, node.Select]:
         ctes: dict[str, node.Select] = {}
-        for cte in wc["ctes"]:
-            ctename = cte["ctename"]
+        for cte in wc.ctes:
+            ctename = cte.ctename
             c = self.__extract_cte(cte)
-            if wc["recursive"]:
+            if wc.recursive:
                 self.__remove_cycleref(c, ctename)
             ctes[ctename] = c
         return ctes
 
-    def __analyze_select(self, stmt: dict[str, Any]) -> node.Select:
+    def __analyze_select(self, stmt: ast.SelectStmt) -> node.Select:
+        self.__depth += 1
+        self.__max_depth = max(self.__max_depth, self.__depth)
+        try:
+            return self.__select(stmt)
+        finally:
+            self.__depth -= 1
+
+    def __select(self, stmt: ast.SelectStmt) -> node.Select:
         tables: dict[str, str | node.Select] = {}
 
-        if "withClause" in stmt.keys():
-            ctes = self.__analyze_withclause(stmt["withClause"])
+        if stmt.withClause:
+            ctes = self.__analyze_withclause(stmt.withClause)
             self.__merge_tables(tables, ctes)
 
-        if "op" in stmt.keys():
-            if stmt["op"]["name"] == "SETOP_UNION":
-                left = self.__analyze_select(stmt["larg"])
-                right = self.__analyze_select(stmt["rarg"])
+        if stmt.op is not None:
+            if stmt.op == SetOperation.SETOP_UNION:
+                left = self.__analyze_select(stmt.larg)
+                right = self.__analyze_select(stmt.rarg)
                 scs = {
                     lk if lk == rk else "column-" + str(i + 1): list(set(lv + rv))
                     for i, ((lk, lv), (rk, rv)) in enumerate(
@@ -468,117 +766,239 @@ class Analyzer:
                 self.__merge_tables(tables, left.tables)
                 return node.Select(scs, rcs, tables)
 
-        if "fromClause" in stmt.keys():
-            for fc in stmt["fromClause"]:
+        aliases: list[str | None] = []
+        if stmt.fromClause:
+            for fc in stmt.fromClause:
                 self.__analyze_fromclause(fc, tables)
+                self.__from_aliases(fc, aliases)
 
         srccols, refcols, _tbls = {}, {}, {}
-        if "targetList" in stmt.keys():
-            srccols, refcols, _tbls = self.__analyze_restargets(stmt["targetList"])
-        elif "valuesLists" in stmt.keys():
-            srccols, refcols, _tbls = self.__analyze_valueslists(stmt["valuesLists"])
+        if stmt.targetList:
+            srccols, refcols, _tbls = self.__analyze_restargets(
+                stmt.targetList, tables, aliases
+            )
+        elif stmt.valuesLists:
+            srccols, refcols, _tbls = self.__analyze_valueslists(stmt.valuesLists)
 
         if len(tables.keys()) == 1:
-            t = next(iter(tables))
-            for scs, rcs in zip(srccols.values(), refcols.values()):
-                for sc in scs:
-                    sc.set_table(t)
-                for rc in rcs:
-                    rc.set_table(t)
+            self.__set_table(next(iter(tables)), srccols, refcols)
+        elif self.__catalog or self.__observed:
+            self.__resolve_columns(
+                {alias: tables[alias] for alias in aliases if alias in tables},
+                srccols,
+                refcols,
+            )
 
         self.__merge_tables(tables, _tbls)
 
-        if "whereClause" in stmt.keys():
-            self.__analyze_whereclause(stmt["whereClause"], tables)
+        if stmt.whereClause:
+            self.__analyze_whereclause(stmt.whereClause, tables)
 
         self.__attach_node_to_table(tables)
 
         return node.Select(srccols, refcols, tables)
 
-    def __analyze_insert(self, stmt: dict[str, Any]) -> node.Insert:
-        tgttable = stmt["relation"]["relname"]
+    def __analyze_insert(self, stmt: ast.InsertStmt) -> node.Insert:
+        tgttable = self.__relname(stmt.relation)
 
-        tgtcols, _, _ = self.__analyze_restargets(stmt["cols"])
-        for scs in tgtcols.values():
-            for sc in scs:
-                sc.set_table(tgttable)
+        tgtcols: Iterable[str] | None = None
+        if stmt.cols:
+            tgtcols, _, _ = self.__analyze_restargets(stmt.cols)
 
         srccols: dict[str, list[Column]] = {}
         refcols: dict[str, list[Column]] = {}
 
         tables: dict[str, str | node.Select] = {}
-        subquery = self.__analyze_select(stmt["selectStmt"])
+        subquery = self.__analyze_select(stmt.selectStmt)
         self.__merge_tables(tables, subquery.tables)
 
+        if tgtcols is None:
+            tgtcols = self.__columns(tgttable)
+        if tgtcols is None:
+            tgtcols = subquery.srccols.keys()
+            self.__unexpanded += 1
+
         for tgtcol, _srccols, _refcols in zip(
             tgtcols, subquery.srccols.values(), subquery.refcols.values()
         ):
             srccols[tgtcol] = _srccols
             refcols[tgtcol] = _refcols
 
-        if "withClause" in stmt.keys():
-            ctes = self.__analyze_withclause(stmt["withClause"])
+        occ = stmt.onConflictClause
+        if occ and occ.targetList:
+            rel = stmt.relation
+            alias = rel.alias.aliasname if rel.alias else rel.relname
+            tables.setdefault(alias, tgttable)
+            scs, rcs, tbls = self.__analyze_restargets(occ.targetList)
+            excluded: Tuple[dict[str, list[Column]], ...] = ({}, {})
+            for name in scs:
+                for cols, ref in ((scs[name], False), (rcs[name], True)):
+                    for c in cols:
+                        if c.table == "excluded":
+                            excluded[ref].setdefault(name, []).extend(
+                                srccols.get(c.name, [])
+                            )
+                            excluded[True].setdefault(name, []).extend(
+                                refcols.get(c.name, [])
+                            )
+                        else:
+                            excluded[ref].setdefault(name, []).append(
+                                c.with_table(alias)
+                            )
+            self.__union(srccols, excluded[False])
+            self.__union(refcols, {name: [] for name in scs} | excluded[True])
+            self.__merge_tables(tables, tbls)
+            if occ.whereClause:
+                self.__analyze_whereclause(occ.whereClause, tables)
+
+        if stmt.withClause:
+            ctes = self.__analyze_withclause(stmt.withClause)
             self.__merge_tables(tables, ctes)
 
         self.__attach_node_to_table(tables)
 
         return node.Insert(srccols, refcols, tgttable, tables)
 
-    def __analyze_update(self, stmt: dict[str, Any]) -> node.Update:
-        rel = stmt["relation"]
+    def __analyze_update(self, stmt: ast.UpdateStmt) -> node.Update:
+        rel = stmt.relation
         tgttbl = {
-            "alias": rel["alias"]["aliasname"] if "alias" in rel.keys() else "",
-            "name": rel["relname"],
+            "alias": rel.alias.aliasname if rel.alias else rel.relname,
+            "name": self.__relname(rel),
         }
 
         tables: dict[str, str | node.Select] = {}
 
-        if "fromClause" in stmt.keys():
-            for fc in stmt["fromClause"]:
+        if stmt.fromClause:
+            for fc in stmt.fromClause:
                 self.__analyze_fromclause(fc, tables)
 
-        srccols, refcols, _tbls = self.__analyze_restargets(stmt["targetList"])
+        srccols, refcols, _tbls = self.__analyze_restargets(stmt.targetList)
 
-        if not tables:
-            for scs, rcs in zip(srccols.values(), refcols.values()):
-                for sc in scs:
-                    sc.replace_table(tgttbl["alias"], tgttbl["name"])
-                for rc in rcs:
-                    rc.replace_table(tgttbl["alias"], tgttbl["name"])
+        scope = dict(tables)
+        scope[tgttbl["alias"]] = tgttbl["name"]
+        self.__resolve_unqualified(scope, tgttbl["alias"], srccols, refcols)
 
         self.__merge_tables(tables, _tbls)
 
-        if "withClause" in stmt.keys():
-            ctes = self.__analyze_withclause(stmt["withClause"])
+        if stmt.withClause:
+            ctes = self.__analyze_withclause(stmt.withClause)
             self.__merge_tables(tables, ctes)
 
-        if "whereClause" in stmt.keys():
-            self.__analyze_whereclause(stmt["whereClause"], tables)
+        if stmt.whereClause:
+            self.__analyze_whereclause(stmt.whereClause, tables)
 
         self.__attach_node_to_table(tables)
 
         return node.Update(srccols, refcols, {tgttbl["alias"]: tgttbl["name"]}, tables)
 
-    def __analyze_delete(self, stmt: dict[str, Any]) -> node.Delete:
-        rel = stmt["relation"]
+    def __analyze_merge(self, stmt: ast.MergeStmt) -> node.Merge:
+        rel = stmt.relation
         tgttbl = {
-            "alias": rel["alias"]["aliasname"] if "alias" in rel.keys() else "",
-            "name": rel["relname"],
+            "alias": rel.alias.aliasname if rel.alias else rel.relname,
+            "name": self.__relname(rel),
         }
 
         tables: dict[str, str | node.Select] = {}
 
-        if "whereClause" in stmt.keys():
-            self.__analyze_whereclause(stmt["whereClause"], tables)
+        if stmt.withClause:
+            ctes = self.__analyze_withclause(stmt.withClause)
+            self.__merge_tables(tables, ctes)
+
+        aliases: list[str | None] = []
+        self.__analyze_fromclause(stmt.sourceRelation, tables)
+        self.__from_aliases(stmt.sourceRelation, aliases)
+        self.__analyze_whereclause(stmt.joinCondition, tables)
 
-        if "usingClause" in stmt.keys():
-            for uc in stmt["usingClause"]:
+        srccols: dict[str, list[Column]] = {}
+        refcols: dict[str, list[Column]] = {}
+        _tbls: dict[str, str | node.Select] = {}
+        for wc in stmt.mergeWhenClauses:
+            if wc.condition:
+                self.__analyze_whereclause(wc.condition, tables)
+            if wc.commandType == CmdType.CMD_UPDATE:
+                scs, rcs, tbls = self.__analyze_restargets(wc.targetList)
+                scope = dict(tables)
+                scope[tgttbl["alias"]] = tgttbl["name"]
+                self.__resolve_unqualified(scope, tgttbl["alias"], scs, rcs)
+            elif wc.commandType == CmdType.CMD_INSERT:
+                scs, rcs, tbls = self.__analyze_mergeinsert(wc, tgttbl["name"])
+                source = aliases[0] if len(aliases) == 1 and aliases[0] else ""
+                self.__resolve_unqualified(tables, source, scs, rcs)
+            else:
+                continue
+            self.__union(srccols, scs)
+            self.__union(refcols, rcs)
+            self.__merge_tables(_tbls, tbls)
+
+        self.__merge_tables(tables, _tbls)
+        self.__attach_node_to_table(tables)
+
+        return node.Merge(srccols, refcols, {tgttbl["alias"]: tgttbl["name"]}, tables)
+
+    def __analyze_mergeinsert(
+        self, wc: ast.MergeWhenClause, tgttable: str
+    ) -> Tuple[
+        dict[str, list[Column]], dict[str, list[Column]], dict[str, str | node.Select]
+    ]:
+        srccols: dict[str, list[Column]] = {}
+        refcols: dict[str, list[Column]] = {}
+        tables: dict[str, str | node.Select] = {}
+
+        names: Iterable[str] | None = (
+            [tgt.name for tgt in wc.targetList] if wc.targetList else None
+        )
+        if names is None and wc.values:
+            names = self.__columns(tgttable)
+            if names is None:
+                self.__unexpanded += 1
+                names = []
+
+        for name, v in zip(names or (), wc.values or ()):
+            srccols[name], refcols[name] = [], []
+            self.__analyze_restarget(v, srccols[name], refcols[name], tables)
+
+        return srccols, refcols, tables
+
+    def __analyze_delete(self, stmt: ast.DeleteStmt) -> node.Delete:
+        rel = stmt.relation
+        tgttbl = {
+            "alias": rel.alias.aliasname if rel.alias else "",
+            "name": self.__relname(rel),
+        }
+
+        tables: dict[str, str | node.Select] = {}
+
+        if stmt.whereClause:
+            self.__analyze_whereclause(stmt.whereClause, tables)
+
+        if stmt.usingClause:
+            for uc in stmt.usingClause:
                 self.__analyze_usingclause(uc, tables)
 
-        if "withClause" in stmt.keys():
-            ctes = self.__analyze_withclause(stmt["withClause"])
+        if stmt.withClause:
+            ctes = self.__analyze_withclause(stmt.withClause)
             self.__merge_tables(tables, ctes)
 
         self.__attach_node_to_table(tables)
 
         return node.Delete({tgttbl["alias"]: tgttbl["name"]}, tables)
+
+    def __analyze_createtableas(self, stmt: ast.CreateTableAsStmt) -> node.Insert:
+        tgttable = self.__relname(stmt.into.rel)
+        subquery = self.__analyze_select(stmt.query)
+
+        tgtcols = (
+            [colname.sval for colname in stmt.into.colNames]
+            if stmt.into.colNames
+            else list(subquery.srccols.keys())
+        )
+
+        srccols: dict[str, list[Column]] = {}
+        refcols: dict[str, list[Column]] = {}
+        for tgtcol, _srccols, _refcols in zip(
+            tgtcols, subquery.srccols.values(), subquery.refcols.values()
+        ):
+            srccols[tgtcol] = _srccols
+            refcols[tgtcol] = _refcols
+
+        return node.Insert(srccols, refcols, tgttable, subquery.tables)
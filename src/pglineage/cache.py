@@ -0,0 +1,127 @@
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import time
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from typing import Tuple
+
+import pglast
+from pglineage import node
+from pglineage.catalog import Catalog
+from pglineage.stmt import RawStmt
+
+
+def _version() -> str:
+    try:
+        return version("pglineage")
+    except PackageNotFoundError:
+        return ""
+
+
+@lru_cache(maxsize=None)
+def _source() -> str:
+    h = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for nm in ("analyzer.py", "node.py", "column.py", "edge.py", "table.py"):
+        try:
+            with open(os.path.join(here, nm), "rb") as f:
+                h.update(f.read())
+        except OSError:
+            return ""
+    return h.hexdigest()
+
+
+class Cache:
+    # bump whenever the analyzer output changes for the same statement
+    __FORMAT = "5"
+    __pat = re.compile(r"\s+")
+
+    def __init__(
+        self,
+        directory: str,
+        max_entries: int = 1000000,
+        catalog: Catalog | None = None,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.__conn = sqlite3.connect(os.path.join(directory, "cache.sqlite3"))
+        self.__conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT PRIMARY KEY, name TEXT, result BLOB, atime REAL)"
+        )
+        self.__salt = Cache.salt(catalog)
+        self.__max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def salt(catalog: Catalog | None = None) -> str:
+        return "\0".join(
+            [
+                Cache.__FORMAT,
+                _version(),
+                _source(),
+                pglast.__version__,
+                catalog.digest if catalog else "",
+            ]
+        )
+
+    @staticmethod
+    def normalize(stmt: str) -> str:
+        return re.sub(Cache.__pat, " ", stmt).strip()
+
+    def key(self, rawstmt: RawStmt) -> str:
+        s = self.__salt + "\0" + self.normalize(rawstmt.stmt)
+        return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+    def get(self, rawstmt: RawStmt) -> Tuple[node.Summary | None, str, int] | None:
+        key = self.key(rawstmt)
+        row = self.__conn.execute(
+            "SELECT name, result FROM summaries WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__conn.execute(
+            "UPDATE summaries SET atime = ? WHERE key = ?", (time.time(), key)
+        )
+        name, result = row[0], pickle.loads(row[1])
+        summary, msg, unexpanded = result
+        if summary and name != rawstmt.name:
+            summary = summary.rename(name, rawstmt.name)
+        return summary, msg, unexpanded
+
+    def put(self, results: list[Tuple[RawStmt, node.Summary | None, str, int]]) -> None:
+        now = time.time()
+        self.__conn.executemany(
+            "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)",
+            [
+                (
+                    self.key(rawstmt),
+                    rawstmt.name,
+                    pickle.dumps((summary, msg, unexpanded), pickle.HIGHEST_PROTOCOL),
+                    now,
+                )
+                for rawstmt, summary, msg, unexpanded, *_ in results
+            ],
+        )
+        self.__evict()
+        self.__conn.commit()
+
+    def __evict(self) -> None:
+        (count,) = self.__conn.execute("SELECT COUNT(*) FROM summaries").fetchone()
+        if count <= self.__max_entries:
+            return
+        self.__conn.execute(
+            "DELETE FROM summaries WHERE key IN "
+            "(SELECT key FROM summaries ORDER BY atime LIMIT ?)",
+            (count - self.__max_entries,),
+        )
+
+    def close(self) -> None:
+        self.__conn.commit()
+        self.__conn.close()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import sys
+from typing import Iterable, Tuple
+
+
+class Catalog:
+    def __init__(
+        self,
+        tables: dict[str, Iterable[str]] | None = None,
+        search_path: Tuple[str, ...] = ("public",),
+    ) -> None:
+        self.search_path = search_path
+        self.__tables: dict[str, dict[str, None]] = {}
+        self.__names: dict[str, list[str]] = {}
+        for nm, cols in (tables or {}).items():
+            self.add(nm, cols)
+
+    def add(self, table: str, columns: Iterable[str]) -> None:
+        table = sys.intern(table)
+        if table not in self.__tables:
+            self.__tables[table] = {}
+            self.__names.setdefault(table.rpartition(".")[2], []).append(table)
+        cols = self.__tables[table]
+        for col in columns:
+            cols.setdefault(sys.intern(col))
+
+    @staticmethod
+    def load(path: str, search_path: Tuple[str, ...] = ("public",)) -> Catalog:
+        rows: list[Tuple[str, int, str]] = []
+        with open(path, encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            missing = {"table_name", "column_name"}.difference(reader.fieldnames or [])
+            if missing:
+                raise ValueError(
+                    path + ": missing catalog columns: " + ", ".join(sorted(missing))
+                )
+            for i, row in enumerate(reader):
+                schema = row.get("table_schema", "")
+                table = (
+                    schema + "." + row["table_name"] if schema else row["table_name"]
+                )
+                pos = row.get("ordinal_position")
+                rows.append((table, int(pos) if pos else i, row["column_name"]))
+
+        catalog = Catalog(search_path=search_path)
+        for table, _, col in sorted(rows, key=lambda r: (r[0], r[1])):
+            catalog.add(table, [col])
+        return catalog
+
+    def qualify(self, name: str) -> str:
+        if name in self.__tables:
+            return name
+        candidates = self.__names.get(name, [])
+        if len(candidates) == 1:
+            return candidates[0]
+        for schema in self.search_path:
+            if schema + "." + name in self.__tables:
+                return schema + "." + name
+        schema, _, rel = name.rpartition(".")
+        if self.search_path and schema == self.search_path[0]:
+            return rel
+        return name
+
+    def columns(self, table: str) -> dict[str, None] | None:
+        return self.__tables.get(self.qualify(table))
+
+    @property
+    def digest(self) -> str:
+        h = hashlib.sha256()
+        h.update("\0".join(self.search_path).encode("utf-8"))
+        for nm in sorted(self.__tables):
+            h.update(("\1" + nm + "\0" + "\0".join(self.__tables[nm])).encode("utf-8"))
+        return h.hexdigest()
+
+    def __contains__(self, table: object) -> bool:
+        return isinstance(table, str) and self.qualify(table) in self.__tables
+
+    def __len__(self) -> int:
+        return len(self.__tables)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import os
+import sys
+from pathlib import Path
+from typing import Iterator
+
+from pglineage import export, metrics
+from pglineage.analyzer import Analyzer
+from pglineage.cache import Cache
+from pglineage.catalog import Catalog
+from pglineage.lineage import PARTITIONS, VIEWS, Lineage
+from pglineage.metrics import Metrics
+from pglineage.project import Project
+from pglineage.reader import FileReader
+from pglineage.stmt import RawStmt
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pglineage", description="Create data lineage from PostgreSQL SQL files."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=["resource"],
+        help="SQL files or directories to scan recursively (default: resource)",
+    )
+    parser.add_argument(
+        "-i",
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="only read files whose path relative to a scanned directory matches",
+    )
+    parser.add_argument(
+        "-x",
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="skip files whose path relative to a scanned directory matches",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="analysis and drawing processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "-r",
+        "--readers",
+        type=int,
+        default=8,
+        help="file reading threads (default: 8)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="output/result",
+        help="output path prefix (default: output/result)",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=("read", "stream", "parse"),
+        default="read",
+        help="statement splitting mode (default: read)",
+    )
+    parser.add_argument(
+        "--encoding",
+        default="",
+        help="encoding of all files instead of detecting it",
+    )
+    parser.add_argument(
+        "--encoding-for",
+        action="append",
+        default=[],
+        metavar="GLOB=ENCODING",
+        help="encoding of files matching GLOB",
+    )
+    parser.add_argument(
+        "--cache", metavar="PATH", help="SQLite cache of analysis results"
+    )
+    parser.add_argument(
+        "--catalog",
+        metavar="PATH",
+        help="CSV export of information_schema.columns used to expand stars",
+    )
+    parser.add_argument(
+        "--project",
+        metavar="DIR",
+        help="keep per-file state in DIR and re-read only changed files",
+    )
+    parser.add_argument(
+        "-e",
+        "--export",
+        action="append",
+        choices=export.FORMATS,
+        default=[],
+        help="export format, may be repeated",
+    )
+    parser.add_argument(
+        "-v",
+        "--view",
+        action="append",
+        choices=VIEWS,
+        default=[],
+        help="drawing to render with graphviz, may be repeated",
+    )
+    parser.add_argument(
+        "-f", "--format", default="png", help="graphviz output format (default: png)"
+    )
+    parser.add_argument(
+        "--partition",
+        choices=PARTITIONS,
+        default="",
+        help="render each connected component separately",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="store column edges in the compact interned form",
+    )
+    parser.add_argument(
+        "--max-failures",
+        type=int,
+        default=-1,
+        help="exit with 1 if more statements or files fail (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-failure-ratio",
+        type=float,
+        default=1.0,
+        help="exit with 1 if a larger share of statements or files fail",
+    )
+    parser.add_argument(
+        "--no-progress", action="store_true", help="disable progress bars"
+    )
+    args = parser.parse_args(argv)
+    if not all("=" in arg for arg in args.encoding_for):
+        parser.error("--encoding-for expects GLOB=ENCODING")
+    if args.project and (args.catalog or args.compact or args.reader != "read"):
+        parser.error(
+            "--project cannot be combined with --catalog, --compact or --reader"
+        )
+    return args
+
+
+def scan(paths: list[str], include: list[str], exclude: list[str]) -> list[str]:
+    include = include if include else ["*"]
+    files: list[str] = []
+    for path in paths:
+        p = Path(path)
+        for f in sorted(p.rglob("*")) if p.is_dir() else [p]:
+            rel = str(f.relative_to(p)) if p.is_dir() else f.name
+            if not f.is_file():
+                continue
+            if not any(fnmatch.fnmatch(rel, g) for g in include):
+                continue
+            if any(fnmatch.fnmatch(rel, g) for g in exclude):
+                continue
+            files.append(str(f))
+    return files
+
+
+def write(lineage: Lineage, output: str, formats: list[str]) -> None:
+    for fmt in formats:
+        if fmt in ("csv", "dot"):
+            for level in export.LEVELS:
+                lineage.export(output + "." + level + "." + fmt, fmt, level)
+        else:
+            lineage.export(output + "." + fmt, fmt)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    metrics.PROGRESS = not args.no_progress
+    stats = Metrics()
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+
+    with stats.stage("scanning"):
+        files = scan(args.paths, args.include, args.exclude)
+    reader = FileReader(
+        args.encoding,
+        dict(arg.rsplit("=", 1) for arg in args.encoding_for),
+    )
+    errors: list[str] = []
+
+    def stream() -> Iterator[list[RawStmt]]:
+        for path, stmts in reader.prefetch(
+            files, args.reader, args.readers, metrics=stats
+        ):
+            if stmts is None:
+                print("file reading error : " + path, file=sys.stderr)
+                errors.append(path)
+            else:
+                yield stmts
+
+    catalog = Catalog.load(args.catalog) if args.catalog else None
+    cache = Cache(args.cache, catalog=catalog) if args.cache else None
+    if args.project:
+        project = Project(args.project, reader, stats)
+        lineage = project.update(files, args.workers, cache)
+        results = project.results
+        for path in project.errors:
+            print("file reading error : " + path, file=sys.stderr)
+            errors.append(path)
+        logger = project.logger
+    else:
+        analyzer = Analyzer(stats, catalog=catalog)
+        results = analyzer.summarize(args.workers, cache, stream())
+        lineage = Lineage.create(
+            [(res.rawstmt, res.summary) for res in results if res.summary],
+            args.compact,
+            stats,
+            analyzer.logger,
+        )
+        logger = analyzer.logger
+    if cache:
+        cache.close()
+
+    with stats.stage("exporting"):
+        write(lineage, args.output, args.export)
+    if args.view:
+        lineage.draw(
+            args.output,
+            args.format,
+            tuple(args.view),
+            args.partition,
+            workers=args.workers,
+        )
+    else:
+        logger.write(args.output + ".log")
+        stats.write(args.output + ".metrics.json")
+
+    failures = len(errors) + sum(1 for res in results if res.msg)
+    total = len(errors) + len(results)
+    print(
+        "files: %d, statements: %d, failures: %d, duplicates: %d"
+        % (len(files), len(results), failures, stats.duplicates),
+        file=sys.stderr,
+    )
+    if 0 <= args.max_failures < failures:
+        return 1
+    if total and failures / total > args.max_failure_ratio:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
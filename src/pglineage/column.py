@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+import sys
+
 
 class Column:
+    __slots__ = ("table", "name")
+
     def __init__(self, table: str, name: str):
-        self.table = table
-        self.name = name
+        object.__setattr__(self, "table", sys.intern(table))
+        object.__setattr__(self, "name", sys.intern(name))
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Column is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Column is immutable")
+
+    def __reduce__(self) -> tuple:
+        return Column, (self.table, self.name)
 
     def __str__(self) -> str:
         if self.table:
@@ -23,13 +36,11 @@ class Column:
         res = 31 * res + hash(self.name)
         return res
 
-    def set_table(self, table: str) -> None:
-        if not self.table:
-            self.table = table
+    def with_table(self, table: str) -> Column:
+        return self if self.table else Column(table, self.name)
 
-    def replace_table(self, old: str, new: str) -> None:
-        if self.table == old:
-            self.table = new
+    def replace_table(self, old: str, new: str) -> Column:
+        return Column(new, self.name) if self.table == old else self
 
     @staticmethod
     def create_from_list(ls: list[str]):
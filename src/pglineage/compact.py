@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Iterable, Iterator, Sequence
+
+from pglineage.column import Column
+from pglineage.edge import ColEdge
+
+
+class Symbols:
+    __slots__ = ("__ids", "names")
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.names: list[str] = []
+        self.__ids: dict[str, int] = {}
+        for name in names:
+            self.id(name)
+
+    def id(self, name: str) -> int:
+        i = self.__ids.get(name)
+        if i is None:
+            i = self.__ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return i
+
+    def get(self, name: str) -> int | None:
+        return self.__ids.get(name)
+
+    def __getitem__(self, i: int) -> str:
+        return self.names[i]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class ColEdges:
+    def __init__(self) -> None:
+        self.symbols = Symbols()
+        self.coltbls = array("I")
+        self.colnms = array("I")
+        self.tails = array("I")
+        self.heads = array("I")
+        self.__cols: dict[int, int] | None = {}
+        self.__keys: set[int] | None = set()
+
+    @staticmethod
+    def create(
+        symbols: Symbols,
+        coltbls: Sequence[int],
+        colnms: Sequence[int],
+        tails: Sequence[int],
+        heads: Sequence[int],
+    ) -> ColEdges:
+        edges = ColEdges()
+        edges.symbols = symbols
+        edges.coltbls, edges.colnms = coltbls, colnms
+        edges.tails, edges.heads = tails, heads
+        edges.freeze()
+        return edges
+
+    def freeze(self) -> None:
+        self.__cols = None
+        self.__keys = None
+
+    def _thaw(self) -> None:
+        if not isinstance(self.tails, array):
+            self.coltbls, self.colnms = array("I", self.coltbls), array(
+                "I", self.colnms
+            )
+            self.tails, self.heads = array("I", self.tails), array("I", self.heads)
+
+    def __index(self) -> None:
+        if self.__cols is None:
+            self.__cols = {
+                t << 32 | n: i
+                for i, (t, n) in enumerate(zip(self.coltbls, self.colnms))
+            }
+        if self.__keys is None:
+            self.__keys = {t << 32 | h for t, h in zip(self.tails, self.heads)}
+
+    def column_id(self, column: Column) -> int:
+        self._thaw()
+        self.__index()
+        t, n = self.symbols.id(column.table), self.symbols.id(column.name)
+        k = t << 32 | n
+        i = self.__cols.get(k)
+        if i is None:
+            i = self.__cols[k] = len(self.coltbls)
+            self.coltbls.append(t)
+            self.colnms.append(n)
+        return i
+
+    def column(self, i: int) -> Column:
+        return Column(self.symbols[self.coltbls[i]], self.symbols[self.colnms[i]])
+
+    def add(self, edge: ColEdge) -> None:
+        self.__index()
+        tail, head = self.column_id(edge.tail), self.column_id(edge.head)
+        k = tail << 32 | head
+        if k in self.__keys:
+            return
+        self.__keys.add(k)
+        self.tails.append(tail)
+        self.heads.append(head)
+
+    def update(self, edges: Iterable[ColEdge]) -> None:
+        for edge in edges:
+            self.add(edge)
+
+    def __contains__(self, edge: object) -> bool:
+        if not isinstance(edge, tuple) or len(edge) != 2:
+            return False
+        self.__index()
+        ids = []
+        for col in edge:
+            t, n = self.symbols.get(col.table), self.symbols.get(col.name)
+            i = None if t is None or n is None else self.__cols.get(t << 32 | n)
+            if i is None:
+                return False
+            ids.append(i)
+        return (ids[0] << 32 | ids[1]) in self.__keys
+
+    def __iter__(self) -> Iterator[ColEdge]:
+        cols: dict[int, Column] = {}
+        for tail, head in zip(self.tails, self.heads):
+            if tail not in cols:
+                cols[tail] = self.column(tail)
+            if head not in cols:
+                cols[head] = self.column(head)
+            yield ColEdge(cols[tail], cols[head])
+
+    def __len__(self) -> int:
+        return len(self.tails)
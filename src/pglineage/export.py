@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import csv
+import json
+from typing import TYPE_CHECKING, Iterator, TextIO
+from xml.sax.saxutils import quoteattr
+
+from pglineage import node
+from pglineage.column import Column
+
+if TYPE_CHECKING:
+    from pglineage.lineage import Lineage
+
+FORMATS = ("json", "ndjson", "graphml", "dot", "csv")
+LEVELS = ("column", "table")
+SECTIONS = ("tables", "statements", "column_edges", "table_edges", "ref_edges")
+
+
+def _column(col: Column) -> dict[str, str]:
+    return {"table": col.table, "column": col.name}
+
+
+def _records(lineage: Lineage) -> Iterator[tuple[str, dict]]:
+    for tbl in lineage.tables.values():
+        yield "tables", {"name": tbl.name, "columns": list(tbl.columns)}
+    for nd in lineage.nodes:
+        yield "statements", {"name": nd}
+    for e in lineage.col_edges:
+        yield "column_edges", {"tail": _column(e.tail), "head": _column(e.head)}
+    for e in lineage.tbl_edges:
+        yield "table_edges", {"tail": e.tail, "head": e.head}
+    for e in lineage.ref_edges:
+        yield "ref_edges", {"tail": e.tail, "head": e.head}
+
+
+def write_json(lineage: Lineage, f: TextIO) -> None:
+    records = _records(lineage)
+    rec = next(records, None)
+    f.write("{")
+    for i, sec in enumerate(SECTIONS):
+        f.write(("," if i else "") + "\n" + json.dumps(sec) + ": [")
+        sep = "\n"
+        while rec and rec[0] == sec:
+            f.write(sep + json.dumps(rec[1], ensure_ascii=False))
+            sep = ",\n"
+            rec = next(records, None)
+        f.write("]")
+    f.write("\n}\n")
+
+
+def write_ndjson(lineage: Lineage, f: TextIO) -> None:
+    for sec, rec in _records(lineage):
+        f.write(json.dumps({"type": sec, **rec}, ensure_ascii=False) + "\n")
+
+
+def write_graphml(lineage: Lineage, f: TextIO) -> None:
+    f.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+        '<key id="kind" for="all" attr.name="kind" attr.type="string"/>\n'
+        '<key id="table" for="node" attr.name="table" attr.type="string"/>\n'
+        '<key id="name" for="node" attr.name="name" attr.type="string"/>\n'
+        '<graph id="lineage" edgedefault="directed">\n'
+    )
+
+    ids: dict[tuple[str, ...], str] = {}
+
+    def nid(*key: str) -> str:
+        return ids.setdefault(key, "n" + str(len(ids)))
+
+    def nd(id: str, kind: str, **data: str) -> None:
+        f.write("<node id=" + quoteattr(id) + ">")
+        f.write('<data key="kind">' + kind + "</data>")
+        for k, v in data.items():
+            f.write('<data key="' + k + '">' + quoteattr(v)[1:-1] + "</data>")
+        f.write("</node>\n")
+
+    def edge(tail: str, head: str, kind: str) -> None:
+        f.write("<edge source=" + quoteattr(tail) + " target=" + quoteattr(head))
+        f.write('><data key="kind">' + kind + "</data></edge>\n")
+
+    for tbl in lineage.tables.values():
+        nd(nid("t", tbl.name), "table", name=tbl.name)
+        for col in tbl.columns:
+            nd(nid("c", tbl.name, col), "column", table=tbl.name, name=col)
+    for name in lineage.nodes:
+        nd(nid("s", name), "statement", name=name)
+
+    stmts = set(lineage.nodes)
+
+    def ref(name: str) -> str:
+        return nid("s" if name in stmts else "t", name)
+
+    for e in lineage.col_edges:
+        edge(
+            nid("c", e.tail.table, e.tail.name),
+            nid("c", e.head.table, e.head.name),
+            "column",
+        )
+    for e in lineage.tbl_edges:
+        edge(ref(e.tail), ref(e.head), "flow")
+    for e in lineage.ref_edges:
+        edge(ref(e.tail), ref(e.head), "ref")
+    f.write("</graph>\n</graphml>\n")
+
+
+def quote(s: str) -> str:
+    return '"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def record(s: str) -> str:
+    res = []
+    for c in s:
+        if c in "{}|<>\\ ":
+            res.append("\\")
+        res.append(c)
+    return "".join(res)
+
+
+def _out_table(tbl: str) -> str:
+    return "" if tbl.startswith(node.Select.STATEMENT) else tbl
+
+
+def dot_lines(lineage: Lineage, level: str = "column") -> Iterator[str]:
+    yield "digraph {\n"
+    yield "\tgraph [rankdir=LR]\n"
+    yield '\tnode [fontname="MS Gothic"]\n'
+
+    if level == "column":
+        used_tables = set()
+        for e in lineage.col_edges:
+            used_tables.add(e.head.table)
+            used_tables.add(e.tail.table)
+
+        for tbl in lineage.tables.values():
+            if tbl.name not in used_tables or not tbl.columns:
+                continue
+            label = "|".join(
+                "<" + record(col) + "> " + record(col) for col in tbl.columns
+            )
+            yield "\t" + quote(tbl.name) + " [label=" + quote(label)
+            yield " shape=record xlabel=" + quote(_out_table(tbl.name)) + "]\n"
+
+        for e in lineage.col_edges:
+            yield "\t" + quote(e.tail.table) + ":" + quote(e.tail.name) + " -> "
+            yield quote(e.head.table) + ":" + quote(e.head.name) + "\n"
+
+    else:
+        for tbl in lineage.tables.values():
+            yield "\t" + quote(tbl.name) + " [label="
+            yield quote(_out_table(tbl.name)) + " shape=cylinder]\n"
+        for name in lineage.nodes:
+            yield "\t" + quote(name) + " [label="
+            yield quote(_out_table(name)) + " shape=note]\n"
+        for e in lineage.tbl_edges:
+            yield "\t" + quote(e.tail) + " -> " + quote(e.head) + "\n"
+        for e in lineage.ref_edges:
+            yield "\t" + quote(e.tail) + " -> " + quote(e.head) + " [style=dashed]\n"
+
+    yield "}\n"
+
+
+def write_dot(lineage: Lineage, f: TextIO, level: str = "column") -> None:
+    f.writelines(dot_lines(lineage, level))
+
+
+def write_csv(lineage: Lineage, f: TextIO, level: str = "column") -> None:
+    writer = csv.writer(f)
+    if level == "column":
+        writer.writerow(["tail_table", "tail_column", "head_table", "head_column"])
+        writer.writerows(
+            (e.tail.table, e.tail.name, e.head.table, e.head.name)
+            for e in lineage.col_edges
+        )
+    else:
+        writer.writerow(["tail", "head", "kind"])
+        writer.writerows((e.tail, e.head, "flow") for e in lineage.tbl_edges)
+        writer.writerows((e.tail, e.head, "ref") for e in lineage.ref_edges)
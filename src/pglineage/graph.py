@@ -0,0 +1,132 @@
+from collections import deque
+from typing import Generic, Hashable, Iterable, Tuple, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class Graph(Generic[T]):
+    def __init__(self, edges: Iterable[Tuple[T, T]]) -> None:
+        self.__succ: dict[T, list[T]] = {}
+        self.__pred: dict[T, list[T]] = {}
+        for tail, head in edges:
+            self.__succ.setdefault(tail, []).append(head)
+            self.__pred.setdefault(head, []).append(tail)
+        self.__closures: Tuple[dict[T, frozenset[T]], dict[T, frozenset[T]]] = ({}, {})
+        self.__roots: list[T] = []
+        self.__bits: dict[T, int] | None = None
+
+    def successors(self, nd: T) -> list[T]:
+        return self.__succ.get(nd, [])
+
+    def predecessors(self, nd: T) -> list[T]:
+        return self.__pred.get(nd, [])
+
+    def closure(self, start: T, reverse: bool = False) -> frozenset[T]:
+        memo = self.__closures[reverse]
+        if start in memo:
+            return memo[start]
+
+        adj = self.__pred if reverse else self.__succ
+        seen: set[T] = set()
+        queue = deque(adj.get(start, []))
+        while queue:
+            nd = queue.popleft()
+            if nd in seen:
+                continue
+            seen.add(nd)
+            if nd in memo:
+                seen.update(memo[nd])
+                continue
+            queue.extend(adj.get(nd, []))
+
+        memo[start] = frozenset(seen)
+        return memo[start]
+
+    def path(self, src: T, dst: T) -> list[T]:
+        prev: dict[T, T] = {src: src}
+        queue = deque([src])
+        while queue:
+            nd = queue.popleft()
+            if nd == dst:
+                res = [nd]
+                while nd != src:
+                    nd = prev[nd]
+                    res.append(nd)
+                return res[::-1]
+            for nxt in self.__succ.get(nd, []):
+                if nxt not in prev:
+                    prev[nxt] = nd
+                    queue.append(nxt)
+        return []
+
+    def components(self) -> list[list[T]]:
+        index: dict[T, int] = {}
+        low: dict[T, int] = {}
+        stack: list[T] = []
+        onstack: set[T] = set()
+        res: list[list[T]] = []
+
+        for start in list(self.__succ) + list(self.__pred):
+            if start in index:
+                continue
+            index[start] = low[start] = len(index)
+            stack.append(start)
+            onstack.add(start)
+            work = [(start, iter(self.__succ.get(start, [])))]
+            while work:
+                nd, it = work[-1]
+                for nxt in it:
+                    if nxt not in index:
+                        index[nxt] = low[nxt] = len(index)
+                        stack.append(nxt)
+                        onstack.add(nxt)
+                        work.append((nxt, iter(self.__succ.get(nxt, []))))
+                        break
+                    if nxt in onstack:
+                        low[nd] = min(low[nd], index[nxt])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[nd])
+                    if low[nd] == index[nd]:
+                        comp: list[T] = []
+                        while True:
+                            v = stack.pop()
+                            onstack.discard(v)
+                            comp.append(v)
+                            if v == nd:
+                                break
+                        res.append(comp)
+        return res
+
+    def __propagate(self) -> dict[T, int]:
+        if self.__bits is not None:
+            return self.__bits
+
+        comps = self.components()
+        comp_of = {nd: i for i, comp in enumerate(comps) for nd in comp}
+        comp_bits = [0] * len(comps)
+        for i in reversed(range(len(comps))):
+            bits = 0
+            for nd in comps[i]:
+                for prv in self.__pred.get(nd, []):
+                    if comp_of[prv] != i:
+                        bits |= comp_bits[comp_of[prv]]
+            if not bits:
+                for nd in comps[i]:
+                    bits |= 1 << len(self.__roots)
+                    self.__roots.append(nd)
+            comp_bits[i] = bits
+
+        self.__bits = {nd: comp_bits[comp_of[nd]] for nd in comp_of}
+        return self.__bits
+
+    def sources(self, nd: T) -> frozenset[T]:
+        bits = self.__propagate().get(nd, 0)
+        res: list[T] = []
+        while bits:
+            low = bits & -bits
+            res.append(self.__roots[low.bit_length() - 1])
+            bits ^= low
+        return frozenset(res)
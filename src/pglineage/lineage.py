@@ -1,67 +1,118 @@
 from __future__ import annotations
 
 import re
-from typing import Tuple
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Tuple
 
 import graphviz as gv
-import tqdm
-from pglineage import node
+from pglineage import export, node, snapshot
+from pglineage.column import Column
+from pglineage.compact import ColEdges, Symbols
 from pglineage.edge import ColEdge, TblEdge
+from pglineage.graph import Graph
 from pglineage.logger import Logger
+from pglineage.metrics import Metrics, progress
 from pglineage.stmt import RawStmt
 from pglineage.table import Table
 
-logger = Logger()
+VIEWS = ("column", "bundled", "table")
+PARTITIONS = ("", "component")
+
+
+def _render(args: Tuple[Lineage, str, str, Tuple[str, ...]]) -> None:
+    lineage, output, format, views = args
+    lineage._render(output, format, views)
 
 
 class Lineage:
     def __init__(
         self,
         tables: dict[str, Table],
-        col_edges: set[ColEdge],
+        col_edges: set[ColEdge] | ColEdges,
         tbl_edges: set[TblEdge],
         ref_edges: set[TblEdge],
         nodes: list[str],
+        summaries: dict[str, Tuple[RawStmt, node.Summary]] | None = None,
+        metrics: Metrics | None = None,
+        logger: Logger | None = None,
     ) -> None:
         self.__tables = tables
         self.__col_edges = col_edges
         self.__tbl_edges = tbl_edges
         self.__ref_edges = ref_edges
         self.__nodes = nodes
-        self.__dot: gv.Digraph = None
-        self.__bar: tqdm.tqdm = None
+        self.__summaries = summaries
+        self.__counts: dict[str, Counter[Any]] | None = None
+        self.__snapshot: snapshot.Snapshot | None = None
+        self.__metrics = metrics
+        self.__logger = logger
+        self.__col_graph: Graph[Column] | None = None
+        self.__tbl_graph: Graph[str] | None = None
+        self.__stmts = set(nodes)
+
+    @property
+    def tables(self) -> dict[str, Table]:
+        return self.__tables
+
+    @property
+    def col_edges(self) -> set[ColEdge] | ColEdges:
+        return self.__col_edges
+
+    @property
+    def tbl_edges(self) -> set[TblEdge]:
+        return self.__tbl_edges
+
+    @property
+    def ref_edges(self) -> set[TblEdge]:
+        return self.__ref_edges
+
+    @property
+    def nodes(self) -> list[str]:
+        return self.__nodes
+
+    @staticmethod
+    def __merge(
+        summaries: list[Tuple[RawStmt, node.Summary]],
+        compact: bool = False,
+        metrics: Metrics | None = None,
+        logger: Logger | None = None,
+    ) -> Lineage:
+        with metrics.stage("creating") if metrics else nullcontext():
+            return Lineage.__merge_summaries(summaries, compact, metrics, logger)
 
     @staticmethod
-    def __merge(nodes: list[Tuple[RawStmt, node.Node]]) -> Lineage:
+    def __merge_summaries(
+        summaries: list[Tuple[RawStmt, node.Summary]],
+        compact: bool,
+        metrics: Metrics | None,
+        logger: Logger | None,
+    ) -> Lineage:
         _nodes: list[str] = []
         tgt_tables_insert: dict[str, Table] = {}
         tgt_tables_other: dict[str, Table] = {}
         src_tables: dict[str, Table] = {}
         ref_tables: set[Table] = set()
-        col_edges: set[ColEdge] = set()
+        col_edges: set[ColEdge] | ColEdges = ColEdges() if compact else set()
         tbl_edges: set[TblEdge] = set()
         ref_edges: set[TblEdge] = set()
 
-        for _nd in tqdm.tqdm(nodes, desc="creating", leave=False):
-            nm, nd = _nd[0].name, _nd[1]
-            try:
-                summary: node.Summary = nd.summary(nm)
-            except Exception as e:
-                logger.set("failed", str(e), _nd[0])
-                continue
-
+        for rawstmt, summary in progress(summaries, "creating"):
             if (
                 not summary.src_tbls
                 and not summary.ref_tbls
-                and isinstance(nd, node.Select)
+                and summary.statement == node.Select.STATEMENT
             ):
                 continue
 
-            _nodes.append(nm)
+            _nodes.append(rawstmt.name)
 
             nm = next(iter(summary.tgt_tbl.keys()))
             tgt_tables = (
-                tgt_tables_insert if isinstance(nd, node.Insert) else tgt_tables_other
+                tgt_tables_insert
+                if summary.statement == node.Insert.STATEMENT
+                else tgt_tables_other
             )
             tgt_tables.setdefault(nm, Table(nm))
             tgt_tables[nm].update(summary.tgt_tbl[nm].columns)
@@ -88,6 +139,8 @@ class Lineage:
             tables.setdefault(t, Table(t))
 
         ref_edges = {e for e in ref_edges if e not in tbl_edges}
+        if isinstance(col_edges, ColEdges):
+            col_edges.freeze()
 
         return Lineage(
             tables,
@@ -95,11 +148,264 @@ class Lineage:
             tbl_edges,
             ref_edges,
             _nodes,
+            {rawstmt.name: (rawstmt, summary) for rawstmt, summary in summaries},
+            metrics,
+            logger,
         )
 
     @staticmethod
-    def create(nodes: list[Tuple[RawStmt, node.Node]]) -> Lineage:
-        return Lineage.__merge(nodes)
+    def create(
+        summaries: list[Tuple[RawStmt, node.Summary]],
+        compact: bool = False,
+        metrics: Metrics | None = None,
+        logger: Logger | None = None,
+    ) -> Lineage:
+        return Lineage.__merge(summaries, compact, metrics, logger)
+
+    def patch(
+        self,
+        removed: list[str],
+        added: list[Tuple[RawStmt, node.Summary]],
+        logger: Logger | None = None,
+    ) -> Lineage:
+        if self.__summaries is None:
+            raise ValueError("lineage has no statement summaries to patch")
+        if self.__counts is None:
+            self.__counts = {
+                k: Counter() for k in ("nodes", "tables", "cols", "col", "tbl", "ref")
+            }
+            for rawstmt, summary in self.__summaries.values():
+                self.__tally(rawstmt.name, summary, 1, None)
+
+        touched: set[TblEdge] = set()
+        for nm in removed:
+            if nm in self.__summaries:
+                self.__tally(nm, self.__summaries.pop(nm)[1], -1, touched)
+        for rawstmt, summary in added:
+            if rawstmt.name in self.__summaries:
+                self.__tally(
+                    rawstmt.name, self.__summaries.pop(rawstmt.name)[1], -1, touched
+                )
+            self.__summaries[rawstmt.name] = (rawstmt, summary)
+            self.__tally(rawstmt.name, summary, 1, touched)
+
+        counts = self.__counts
+        for e in touched:
+            if counts["ref"][e] and not counts["tbl"][e]:
+                self.__ref_edges.add(e)
+            else:
+                self.__ref_edges.discard(e)
+        if len(self.__nodes) != len(counts["nodes"]):
+            self.__nodes[:] = dict.fromkeys(
+                nd for nd in self.__nodes if nd in counts["nodes"]
+            )
+        if len(self.__col_edges) != len(counts["col"]):
+            col_edges = ColEdges()
+            col_edges.update(e for e in self.__col_edges if e in counts["col"])
+            col_edges.freeze()
+            self.__col_edges = col_edges
+
+        self.__stmts = set(self.__nodes)
+        self.__col_graph = None
+        self.__tbl_graph = None
+        if logger:
+            self.__logger = logger
+        return self
+
+    @staticmethod
+    def __bump(counter: Counter[Any], key: Any, n: int) -> int:
+        before = counter[key]
+        after = before + n
+        if after:
+            counter[key] = after
+        else:
+            del counter[key]
+        return (after > 0) - (before > 0)
+
+    def __tally(
+        self, name: str, summary: node.Summary, n: int, touched: set[TblEdge] | None
+    ) -> None:
+        if (
+            not summary.src_tbls
+            and not summary.ref_tbls
+            and summary.statement == node.Select.STATEMENT
+        ):
+            return
+        counts = self.__counts
+        if self.__bump(counts["nodes"], name, n) > 0 and touched is not None:
+            self.__nodes.append(name)
+
+        tables = [*summary.tgt_tbl.values(), *summary.src_tbls.values()]
+        tables.extend(Table(t) for t in summary.ref_tbls)
+        for tbl in tables:
+            diff = self.__bump(counts["tables"], tbl.name, n)
+            if touched is None:
+                for col in tbl.columns:
+                    self.__bump(counts["cols"], (tbl.name, col), n)
+                continue
+            if diff > 0:
+                self.__tables[tbl.name] = Table(tbl.name)
+            for col in tbl.columns:
+                match self.__bump(counts["cols"], (tbl.name, col), n):
+                    case 1:
+                        self.__tables[tbl.name].add(col)
+                    case -1 if diff == 0:
+                        self.__tables[tbl.name].columns.pop(col, None)
+            if diff < 0:
+                del self.__tables[tbl.name]
+
+        for e in summary.col_edges:
+            diff = self.__bump(counts["col"], e, n)
+            if touched is None:
+                continue
+            if diff > 0:
+                self.__col_edges.add(e)
+            elif diff < 0 and not isinstance(self.__col_edges, ColEdges):
+                self.__col_edges.discard(e)
+        for e in summary.tbl_edges:
+            diff = self.__bump(counts["tbl"], e, n)
+            if touched is None:
+                continue
+            if diff > 0:
+                self.__tbl_edges.add(e)
+            elif diff < 0:
+                self.__tbl_edges.discard(e)
+            touched.add(e)
+        for e in summary.ref_edges:
+            self.__bump(counts["ref"], e, n)
+            if touched is not None:
+                touched.add(e)
+
+    def save(self, path: str) -> None:
+        col_edges = self.__col_edges
+        if not isinstance(col_edges, ColEdges):
+            col_edges = ColEdges()
+            col_edges.update(self.__col_edges)
+        symbols = Symbols(col_edges.symbols.names)
+
+        tblnames, tblcolptr, tblcols = [], [0], []
+        for tbl in self.__tables.values():
+            tblnames.append(symbols.id(tbl.name))
+            tblcols.extend(symbols.id(col) for col in tbl.columns)
+            tblcolptr.append(len(tblcols))
+
+        sections = {
+            "tblnames": tblnames,
+            "tblcolptr": tblcolptr,
+            "tblcols": tblcols,
+            "coltbls": col_edges.coltbls,
+            "colnms": col_edges.colnms,
+            "tails": col_edges.tails,
+            "heads": col_edges.heads,
+            "tbltails": [symbols.id(e.tail) for e in self.__tbl_edges],
+            "tblheads": [symbols.id(e.head) for e in self.__tbl_edges],
+            "reftails": [symbols.id(e.tail) for e in self.__ref_edges],
+            "refheads": [symbols.id(e.head) for e in self.__ref_edges],
+            "nodes": [symbols.id(nd) for nd in self.__nodes],
+        }
+        snapshot.dump(path, symbols.names, sections)
+
+    @staticmethod
+    def load(path: str) -> Lineage:
+        snap = snapshot.load(path)
+        names, sections = snap.names, snap.sections
+        symbols = Symbols(names)
+
+        tables: dict[str, Table] = {}
+        ptr = sections["tblcolptr"]
+        tblcols = sections["tblcols"]
+        for i, nm in enumerate(sections["tblnames"]):
+            tbl = tables[names[nm]] = Table(names[nm])
+            tbl.update(names[col] for col in tblcols[ptr[i] : ptr[i + 1]])
+
+        col_edges = ColEdges.create(
+            symbols,
+            sections["coltbls"],
+            sections["colnms"],
+            sections["tails"],
+            sections["heads"],
+        )
+        tbl_edges = {
+            TblEdge(names[t], names[h])
+            for t, h in zip(sections["tbltails"], sections["tblheads"])
+        }
+        ref_edges = {
+            TblEdge(names[t], names[h])
+            for t, h in zip(sections["reftails"], sections["refheads"])
+        }
+        nodes = [names[nd] for nd in sections["nodes"]]
+        lineage = Lineage(tables, col_edges, tbl_edges, ref_edges, nodes)
+        lineage.__snapshot = snap
+        return lineage
+
+    def close(self) -> None:
+        if self.__snapshot is None:
+            return
+        if isinstance(self.__col_edges, ColEdges):
+            self.__col_edges._thaw()
+        self.__snapshot.close()
+        self.__snapshot = None
+
+    def __enter__(self) -> Lineage:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __column_graph(self) -> Graph[Column]:
+        if self.__col_graph is None:
+            self.__col_graph = Graph((e.tail, e.head) for e in self.__col_edges)
+        return self.__col_graph
+
+    def __table_graph(self) -> Graph[str]:
+        if self.__tbl_graph is None:
+            self.__tbl_graph = Graph(self.__tbl_edges)
+        return self.__tbl_graph
+
+    def upstream_columns(self, table: str, column: str) -> frozenset[Column]:
+        return self.__column_graph().closure(Column(table, column), reverse=True)
+
+    def downstream_columns(self, table: str, column: str) -> frozenset[Column]:
+        return self.__column_graph().closure(Column(table, column))
+
+    def upstream_tables(self, table: str) -> frozenset[str]:
+        closure = self.__table_graph().closure(table, reverse=True)
+        return closure.difference(self.__stmts)
+
+    def downstream_tables(self, table: str) -> frozenset[str]:
+        closure = self.__table_graph().closure(table)
+        return closure.difference(self.__stmts)
+
+    def sources(self, table: str, column: str) -> frozenset[Column]:
+        return self.__column_graph().sources(Column(table, column))
+
+    def column_path(self, src: Column, dst: Column) -> list[Column]:
+        return self.__column_graph().path(src, dst)
+
+    def writers(self, table: str) -> list[str]:
+        return [
+            nd for nd in self.__table_graph().predecessors(table) if nd in self.__stmts
+        ]
+
+    def export(self, path: str, format: str = "json", level: str = "column") -> None:
+        if level not in export.LEVELS:
+            raise ValueError("unknown level: " + level)
+        match format:
+            case "json":
+                writer = export.write_json
+            case "ndjson":
+                writer = export.write_ndjson
+            case "graphml":
+                writer = export.write_graphml
+            case "dot":
+                writer = lambda lng, f: export.write_dot(lng, f, level)
+            case "csv":
+                writer = lambda lng, f: export.write_csv(lng, f, level)
+            case _:
+                raise ValueError("unknown format: " + format)
+
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer(self, f)
 
     def __bundled(self) -> Lineage:
         ptrn = re.compile("-[0-9]+$")
@@ -115,68 +421,130 @@ class Lineage:
         res = {f2(_re) for _re in self.__ref_edges} - tes
         return Lineage(self.__tables, self.__col_edges, tes, res, nds)
 
-    def draw(self, output: str = "output/result", format: str = "png") -> None:
-        self.__bar = tqdm.tqdm(total=3, desc="drawing", leave=False)
-        self.__draw_column_level(output + ".clv", format)
-        self.__bar.update(1)
-        self.__bundled().__draw_table_level(output + "_bundled_" + ".tlv", format)
-        self.__bar.update(1)
-        self.__draw_table_level(output + ".tlv", format)
-        self.__bar.update(1)
-        logger.write(output + ".log")
-
-    def __draw_column_level(self, output: str, format: str) -> None:
-        self.__dot = gv.Digraph(format=format)
-        self.__dot.attr("graph", rankdir="LR")
-        self.__dot.attr("node", fontname="MS Gothic")
-
-        used_tables = set()
-        for e in self.__col_edges:
-            used_tables.add(e.head.table)
-            used_tables.add(e.tail.table)
-
-        for tbl in self.__tables.values():
-            if tbl.name not in used_tables:
-                continue
-            if not tbl.columns:
-                continue
-            xlabel = self.__out_table(tbl.name)
-            label = ""
-            for col in tbl.columns:
-                sep = "|" if label else ""
-                label += sep + "<" + col + "> " + col
-            self.__dot.node(tbl.name, shape="record", label=label, xlabel=xlabel)
-
-        for edge in self.__col_edges:
-            self.__dot.edge(
-                edge.tail.table + ":" + edge.tail.name,
-                edge.head.table + ":" + edge.head.name,
-            )
-
-        self.__dot.render(output)
-
-    def __draw_table_level(self, output: str, format: str) -> None:
-        self.__dot = gv.Digraph(format=format)
-        self.__dot.attr("graph", rankdir="LR")
-        self.__dot.attr("node", fontname="MS Gothic")
-
-        for tbl in self.__tables.values():
-            self.__dot.node(
-                tbl.name,
-                shape="cylinder",
-                label=self.__out_table(tbl.name),
+    def draw(
+        self,
+        output: str = "output/result",
+        format: str = "png",
+        views: Tuple[str, ...] = VIEWS,
+        partition: str = "",
+        tables: list[str] | None = None,
+        hops: int = 1,
+        workers: int = 1,
+    ) -> None:
+        if partition not in PARTITIONS:
+            raise ValueError("unknown partition: " + partition)
+        if tables:
+            parts = [(output, self.__subset(self.__neighborhood(tables, hops)))]
+        elif partition == "component":
+            parts = [
+                (output + "-" + str(i + 1), self.__subset(names))
+                for i, names in enumerate(self.__components())
+            ]
+        else:
+            parts = [(output, self)]
+
+        bar = progress(desc="drawing", total=len(parts) * len(views))
+        with self.__metrics.stage("drawing") if self.__metrics else nullcontext():
+            if workers > 1 and len(parts) > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for _ in executor.map(
+                        _render, [(lng, out, format, views) for out, lng in parts]
+                    ):
+                        bar.update(len(views))
+            else:
+                for out, lng in parts:
+                    lng._render(out, format, views, bar)
+        bar.close()
+        if self.__logger:
+            self.__logger.write(output + ".log")
+        if self.__metrics:
+            self.__metrics.write(output + ".metrics.json")
+
+    def _render(
+        self,
+        output: str,
+        format: str,
+        views: Tuple[str, ...],
+        bar: Any = None,
+    ) -> None:
+        for view in views:
+            match view:
+                case "column":
+                    self.__draw(output + ".clv", format, "column")
+                case "bundled":
+                    self.__bundled().__draw(
+                        output + "_bundled_" + ".tlv", format, "table"
+                    )
+                case "table":
+                    self.__draw(output + ".tlv", format, "table")
+                case _:
+                    raise ValueError("unknown view: " + view)
+            if bar:
+                bar.update(1)
+
+    def __pseudo(self, nd: str) -> bool:
+        return nd.startswith(node.Select.STATEMENT)
+
+    def __components(self) -> list[set[str]]:
+        parent: dict[str, str] = {}
+
+        def find(nd: str) -> str:
+            parent.setdefault(nd, nd)
+            while parent[nd] != nd:
+                parent[nd] = parent[parent[nd]]
+                nd = parent[nd]
+            return nd
+
+        for nd in list(self.__tables) + list(self.__nodes):
+            if not self.__pseudo(nd):
+                find(nd)
+        for e in self.__tbl_edges | self.__ref_edges:
+            if not self.__pseudo(e.tail) and not self.__pseudo(e.head):
+                parent[find(e.tail)] = find(e.head)
+
+        components: dict[str, set[str]] = {}
+        for nd in list(parent):
+            components.setdefault(find(nd), set()).add(nd)
+        return sorted(components.values(), key=min)
+
+    def __neighborhood(self, tables: list[str], hops: int) -> set[str]:
+        adj: dict[str, list[str]] = {}
+        for e in self.__tbl_edges | self.__ref_edges:
+            adj.setdefault(e.tail, []).append(e.head)
+            adj.setdefault(e.head, []).append(e.tail)
+
+        seen = set(tables)
+        frontier = list(tables)
+        for _ in range(hops * 2):
+            frontier = [
+                nxt
+                for nd in frontier
+                for nxt in adj.get(nd, [])
+                if nxt not in seen and not self.__pseudo(nxt)
+            ]
+            seen.update(frontier)
+        return seen
+
+    def __subset(self, names: set[str]) -> Lineage:
+        def keep(tail: str, head: str) -> bool:
+            return (tail in names or self.__pseudo(tail)) and (
+                head in names or self.__pseudo(head)
             )
 
-        for name in self.__nodes:
-            self.__dot.node(name, label=self.__out_table(name), shape="note")
-
-        for edge in self.__tbl_edges:
-            self.__dot.edge(edge.tail, edge.head)
-
-        for edge in self.__ref_edges:
-            self.__dot.edge(edge.tail, edge.head, style="dashed")
-
-        self.__dot.render(output)
-
-    def __out_table(self, tbl: str) -> str:
-        return "" if tbl.startswith(node.Select.STATEMENT) else tbl
+        tbl_edges = {e for e in self.__tbl_edges if keep(e.tail, e.head)}
+        ref_edges = {e for e in self.__ref_edges if keep(e.tail, e.head)}
+        col_edges = {e for e in self.__col_edges if keep(e.tail.table, e.head.table)}
+        used = {e.tail for e in tbl_edges | ref_edges} | {
+            e.head for e in tbl_edges | ref_edges
+        }
+        tables = {
+            nm: tbl
+            for nm, tbl in self.__tables.items()
+            if nm in names or (self.__pseudo(nm) and nm in used)
+        }
+        nodes = [nd for nd in self.__nodes if nd in names]
+        return Lineage(tables, col_edges, tbl_edges, ref_edges, nodes)
+
+    def __draw(self, output: str, format: str, level: str) -> None:
+        source = "".join(export.dot_lines(self, level))
+        gv.Source(source, format=format).render(output)
@@ -1,38 +1,88 @@
 import csv
+import heapq
+import itertools
+import os
 import re
-from typing import NamedTuple
+import tempfile
+import weakref
+from typing import Iterator, NamedTuple
 
 from pglineage.stmt import RawStmt
 
 
 class Row(NamedTuple):
+    name: str
+    seq: int
     result: str
     msg: str
-    name: str
     stmt: str
 
 
 class Logger:
-    __rows: dict[str, Row] = {}
     __pat = re.compile("[ ]{2,}")
 
+    def __init__(self, buffer: int = 10000) -> None:
+        self.__buffer = buffer
+        self.__rows: list[Row] = []
+        self.__runs: list[str] = []
+        self.__seq = 0
+        weakref.finalize(self, Logger.__cleanup, self.__runs)
+
+    @staticmethod
+    def __cleanup(runs: list[str]) -> None:
+        for path in runs:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        runs.clear()
+
     def set(self, result: str, msg: str, rawstmt: RawStmt) -> None:
-        Logger.__rows[rawstmt.name] = Row(result, msg, rawstmt.name, rawstmt.stmt)
+        self.__rows.append(
+            Row(
+                rawstmt.name,
+                self.__seq,
+                result,
+                self.__fmt(msg),
+                self.__fmt(rawstmt.stmt),
+            )
+        )
+        self.__seq += 1
+        if len(self.__rows) >= self.__buffer:
+            self.__spill()
 
-    def __sort(self) -> None:
-        Logger.__rows = dict(sorted(Logger.__rows.items()))
+    def __spill(self) -> None:
+        self.__rows.sort()
+        fd, path = tempfile.mkstemp(prefix="pglineage-", suffix=".csv")
+        self.__runs.append(path)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows(self.__rows)
+        self.__rows = []
+
+    def __run(self, path: str) -> Iterator[Row]:
+        with open(path, encoding="utf-8", newline="") as f:
+            for name, seq, result, msg, stmt in csv.reader(f):
+                yield Row(name, int(seq), result, msg, stmt)
 
     def __fmt(self, s: str) -> str:
         res = "".join(s.splitlines())
         res = re.sub(Logger.__pat, " ", res)
         return res[:80] + " ..." if len(res) >= 80 else res[:80]
 
+    def rows(self) -> Iterator[Row]:
+        self.__rows.sort()
+        merged = heapq.merge(self.__rows, *(self.__run(p) for p in self.__runs))
+        for _, group in itertools.groupby(merged, key=lambda row: row.name):
+            *_, row = group
+            yield row
+
     def write(self, path: str) -> None:
-        self.__sort()
         with open(path, "w", encoding="utf-8") as f:
             writer = csv.writer(f)
             writer.writerow(["name", "status", "error_message", "query"])
-            for row in Logger.__rows.values():
-                writer.writerow(
-                    [row.name, row.result, self.__fmt(row.msg), self.__fmt(row.stmt)]
-                )
+            for row in self.rows():
+                writer.writerow([row.name, row.result, row.msg, row.stmt])
+
+    def close(self) -> None:
+        self.__rows = []
+        Logger.__cleanup(self.__runs)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import heapq
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, TypeVar
+
+try:
+    import tqdm
+except ImportError:
+    tqdm = None
+
+T = TypeVar("T")
+
+PROGRESS = True
+
+
+class _NullBar:
+    def update(self, n: int = 1) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def progress(
+    iterable: Iterable[T] | None = None, desc: str = "", total: int | None = None
+) -> Any:
+    if not PROGRESS or tqdm is None:
+        return _NullBar() if iterable is None else iterable
+    return tqdm.tqdm(iterable, desc=desc, total=total, leave=False)
+
+
+class Metrics:
+    def __init__(self, slowest: int = 10, profile: str = "") -> None:
+        self.profile = profile
+        self.stages: dict[str, dict[str, float]] = {}
+        self.statements = 0
+        self.duplicates = 0
+        self.failures: Counter[str] = Counter()
+        self.max_depth = 0
+        self.__n = slowest
+        self.__total = 0.0
+        self.__slowest: list[tuple[float, str]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            st = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+            st["wall"] += time.perf_counter() - wall
+            st["cpu"] += time.process_time() - cpu
+            st["calls"] += 1
+
+    def statement(
+        self, name: str, elapsed: float, depth: int = 0, error: str = ""
+    ) -> None:
+        self.statements += 1
+        self.__total += elapsed
+        self.max_depth = max(self.max_depth, depth)
+        if error:
+            self.failures[error] += 1
+        if len(self.__slowest) < self.__n:
+            heapq.heappush(self.__slowest, (elapsed, name))
+        elif self.__n:
+            heapq.heappushpop(self.__slowest, (elapsed, name))
+
+    def slowest(self) -> list[tuple[str, float]]:
+        return [(nm, t) for t, nm in sorted(self.__slowest, reverse=True)]
+
+    def dedup_ratio(self) -> float:
+        total = self.statements + self.duplicates
+        return self.duplicates / total if total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stages": self.stages,
+            "statements": {
+                "count": self.statements,
+                "total": self.__total,
+                "mean": self.__total / self.statements if self.statements else 0.0,
+                "max_depth": self.max_depth,
+                "duplicates": self.duplicates,
+                "dedup_ratio": self.dedup_ratio(),
+                "slowest": [{"name": nm, "elapsed": t} for nm, t in self.slowest()],
+            },
+            "failures": dict(self.failures),
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import abc
-from typing import Any, NamedTuple
+from typing import Any, NamedTuple, Tuple
 
 from pglineage.column import Column
 from pglineage.edge import ColEdge, TblEdge
@@ -15,6 +15,19 @@ class Summary(NamedTuple):
     col_edges: set[ColEdge]
     tbl_edges: set[TblEdge]
     ref_edges: set[TblEdge]
+    statement: str = ""
+
+    def rename(self, sqlnm: str, new: str) -> Summary:
+        def f(edge: TblEdge) -> TblEdge:
+            return TblEdge(
+                new if edge.tail == sqlnm else edge.tail,
+                new if edge.head == sqlnm else edge.head,
+            )
+
+        return self._replace(
+            tbl_edges={f(e) for e in self.tbl_edges},
+            ref_edges={f(e) for e in self.ref_edges},
+        )
 
 
 class Node(metaclass=abc.ABCMeta):
@@ -94,7 +107,15 @@ class Node(metaclass=abc.ABCMeta):
 
         tbl_edges.add(TblEdge(sqlnm, tgttbl_name))
 
-        return Summary(src_tbls, tgt_tbl, ref_tbls, col_edges, tbl_edges, ref_edges)
+        return Summary(
+            src_tbls,
+            tgt_tbl,
+            ref_tbls,
+            col_edges,
+            tbl_edges,
+            ref_edges,
+            self.STATEMENT,
+        )
 
 
 class Select(Node):
@@ -111,19 +132,37 @@ class Select(Node):
         self.refcols = refcols
         self.tables = tables
         self.tgttable = ""
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self.__flat: Select | None = None
+        self.__index: dict[Tuple[str, int], list[Column]] = {}
+        self.__traced: dict[str, list[str]] = {}
 
     def format(self) -> dict[str, Any]:
         return super().format()
 
+    def trace_table(self, results: list[str], alias="") -> None:
+        if alias not in self.__traced:
+            traced: list[str] = []
+            super().trace_table(traced, alias)
+            self.__traced[alias] = list(dict.fromkeys(traced))
+        results.extend(self.__traced[alias])
+
     def _trace_column(self, tgtcol: str, _type: int, results: list[Column]) -> None:
-        cols = self.srccols[tgtcol] if _type == 1 else self.refcols[tgtcol]
-        for refcol in cols:
-            if refcol.table not in self.tables.keys():
-                continue
-            if isinstance(self.tables[refcol.table], str):
-                results.append(Column(self.tables[refcol.table], refcol.name))
-            elif isinstance(self.tables[refcol.table], Select):
-                self.tables[refcol.table]._trace_column(refcol.name, _type, results)
+        key = (tgtcol, _type)
+        if key not in self.__index:
+            traced: list[Column] = []
+            cols = self.srccols[tgtcol] if _type == 1 else self.refcols[tgtcol]
+            for refcol in cols:
+                if refcol.table not in self.tables.keys():
+                    continue
+                if isinstance(self.tables[refcol.table], str):
+                    traced.append(Column(self.tables[refcol.table], refcol.name))
+                elif isinstance(self.tables[refcol.table], Select):
+                    self.tables[refcol.table]._trace_column(refcol.name, _type, traced)
+            self.__index[key] = traced
+        results.extend(self.__index[key])
 
     def __flatten_cols(self, _type: int) -> dict[str, list[Column]]:
         results: dict[str, list[Column]] = {}
@@ -143,13 +182,14 @@ class Select(Node):
         return results
 
     def _flatten(self) -> Select:
-        f_srccols = self.__flatten_cols(1)
-        f_refcols = self.__flatten_cols(2)
-        refs: list[str] = []
-        super().trace_table(refs)
-        f_tables = {ref: ref for ref in refs}
-        f_node = Select(f_srccols, f_refcols, f_tables)
-        return f_node
+        if self.__flat is None:
+            f_srccols = self.__flatten_cols(1)
+            f_refcols = self.__flatten_cols(2)
+            refs: list[str] = []
+            super().trace_table(refs)
+            f_tables = {ref: ref for ref in refs}
+            self.__flat = Select(f_srccols, f_refcols, f_tables)
+        return self.__flat
 
     def _tgttblnm(self) -> str:
         return self.__class__.STATEMENT + "-" + str(self.__class__.__COUNT)
@@ -256,7 +296,7 @@ class Update(Node):
         refs: list[str] = []
         super().trace_table(refs)
         f_tables = {ref: ref for ref in refs}
-        f_node = Update(f_srccols, f_refcols, self.tgttable, f_tables)
+        f_node = self.__class__(f_srccols, f_refcols, self.tgttable, f_tables)
         return f_node
 
     def _tgttblnm(self) -> str:
@@ -266,6 +306,10 @@ class Update(Node):
         return super().summary(sqlnm)
 
 
+class Merge(Update):
+    STATEMENT = "Merge"
+
+
 class Delete(Node):
     STATEMENT = "Delete"
 
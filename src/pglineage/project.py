@@ -0,0 +1,164 @@
+import hashlib
+import itertools
+import json
+import os
+import pickle
+from typing import Any, Tuple
+
+from pglineage.analyzer import Analyzer, Result
+from pglineage.cache import Cache
+from pglineage.lineage import Lineage
+from pglineage.logger import Logger
+from pglineage.metrics import Metrics
+from pglineage.reader import FileReader
+
+
+class Project:
+    __MANIFEST = "manifest.json"
+    __RESULTS = "results.pickle"
+
+    def __init__(
+        self,
+        directory: str,
+        reader: FileReader | None = None,
+        metrics: Metrics | None = None,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.__dir = directory
+        self.__reader = reader if reader else FileReader()
+        self.__metrics = metrics
+        self.__manifest: dict[str, dict[str, Any]] = {}
+        self.__results: dict[str, list[Result]] = {}
+        self.__lineage: Lineage | None = None
+        self.__logger = Logger()
+        self.__errors: list[str] = []
+        self.__restore()
+
+    @property
+    def results(self) -> list[Result]:
+        return [res for results in self.__results.values() for res in results]
+
+    @property
+    def errors(self) -> list[str]:
+        return self.__errors
+
+    @property
+    def logger(self) -> Logger:
+        return self.__logger
+
+    def __path(self, name: str) -> str:
+        return os.path.join(self.__dir, name)
+
+    def __restore(self) -> None:
+        try:
+            with open(self.__path(Project.__MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("salt") != Cache.salt():
+                return
+            with open(self.__path(Project.__RESULTS), "rb") as f:
+                results = pickle.load(f)
+        except (
+            OSError,
+            ValueError,
+            EOFError,
+            AttributeError,
+            ImportError,
+            pickle.UnpicklingError,
+        ):
+            return
+        self.__manifest, self.__results = manifest["files"], results
+
+    def __save(self) -> None:
+        tmp = self.__path(Project.__MANIFEST + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"salt": Cache.salt(), "files": self.__manifest}, f, indent=2)
+        os.replace(tmp, self.__path(Project.__MANIFEST))
+
+        tmp = self.__path(Project.__RESULTS + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(self.__results, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.__path(Project.__RESULTS))
+
+    def __hash(self, path: str) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for b in iter(lambda: f.read(1 << 20), b""):
+                h.update(b)
+        return h.hexdigest()
+
+    def __changed(self, path: str) -> bool:
+        st = os.stat(path)
+        entry = self.__manifest.get(path)
+        if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return False
+
+        digest = self.__hash(path)
+        if entry and entry["hash"] == digest:
+            entry["mtime"], entry["size"] = st.st_mtime_ns, st.st_size
+            return False
+
+        self.__manifest[path] = {
+            "mtime": st.st_mtime_ns,
+            "size": st.st_size,
+            "hash": digest,
+            "stmts": [],
+        }
+        return True
+
+    def update(
+        self, files: list[str], workers: int = 1, cache: Cache | None = None
+    ) -> Lineage:
+        removed: list[str] = []
+        paths = set(files)
+        for path in [p for p in self.__manifest if p not in paths]:
+            removed.extend(self.__manifest.pop(path)["stmts"])
+            self.__results.pop(path, None)
+
+        changed = [path for path in files if self.__changed(path)]
+        unchanged = paths.difference(changed)
+        logger = self.__logger = Logger()
+        self.__errors = []
+        analyzer = Analyzer(self.__metrics, logger=logger)
+        loaded: list[Tuple[str, int]] = []
+        for path in changed:
+            removed.extend(res.rawstmt.name for res in self.__results.pop(path, []))
+            try:
+                stmts = self.__reader.read(path)
+            except Exception:
+                self.__manifest.pop(path)
+                self.__errors.append(path)
+                continue
+            self.__manifest[path]["stmts"] = [stmt.name for stmt in stmts]
+            analyzer.load(stmts)
+            loaded.append((path, len(stmts)))
+
+        results = iter(analyzer.summarize(workers, cache))
+        for path, n in loaded:
+            self.__results[path] = list(itertools.islice(results, n))
+
+        for path in unchanged:
+            for res in self.__results.get(path, []):
+                logger.set("failed" if res.msg else "success", res.msg, res.rawstmt)
+
+        summaries = [
+            (res.rawstmt, res.summary)
+            for path in changed
+            for res in self.__results.get(path, [])
+            if res.summary
+        ]
+        if self.__lineage:
+            self.__lineage = self.__lineage.patch(removed, summaries, logger)
+        else:
+            self.__lineage = Lineage.create(
+                [
+                    (res.rawstmt, res.summary)
+                    for path in files
+                    for res in self.__results.get(path, [])
+                    if res.summary
+                ],
+                metrics=self.__metrics,
+                logger=logger,
+            )
+
+        self.__save()
+        return self.__lineage
@@ -1,35 +1,235 @@
+import codecs
+import fnmatch
+import io
 import os
 import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Iterable, Iterator, Tuple
 
 from chardet import detect
+from pglast import ast, parse_sql
+from pglast.parser import ParseError
+from pglineage.metrics import Metrics
 from pglineage.stmt import RawStmt
 
 
+class _Scanner:
+    __token = re.compile(r"'|\"|;|--|/\*|\$(?:[A-Za-z_][A-Za-z_0-9]*)?\$")
+    __comment = re.compile(r"/\*|\*/")
+
+    def __init__(self, keyword: re.Pattern) -> None:
+        self.__keyword = keyword
+        self.__parts: list[str] = []
+        self.__start = -1
+        self.__size = 0
+        self.__quote = ""
+        self.__depth = 0
+
+    def __append(self, s: str, quoted: bool = False) -> None:
+        if self.__start < 0 and not quoted:
+            m = self.__keyword.search(s)
+            if m:
+                self.__start = self.__size + m.start()
+        self.__parts.append(s)
+        self.__size += len(s)
+
+    def feed(self, line: str) -> Iterator[str]:
+        pos = 0
+        while pos < len(line):
+            if self.__depth:
+                m = self.__comment.search(line, pos)
+                if not m:
+                    return
+                self.__depth += 1 if m.group() == "/*" else -1
+                pos = m.end()
+
+            elif self.__quote:
+                end = line.find(self.__quote, pos)
+                if end < 0:
+                    self.__append(line[pos:], True)
+                    return
+                end += len(self.__quote)
+                self.__append(line[pos:end], True)
+                self.__quote = ""
+                pos = end
+
+            else:
+                m = self.__token.search(line, pos)
+                if not m:
+                    self.__append(line[pos:])
+                    return
+                self.__append(line[pos : m.start()])
+                tok = m.group()
+                pos = m.end()
+                if tok == ";":
+                    self.__append(tok)
+                    stmt = self.flush()
+                    if stmt:
+                        yield stmt
+                elif tok == "--":
+                    self.__append("\n" if line.endswith("\n") else "")
+                    return
+                elif tok == "/*":
+                    self.__depth = 1
+                else:
+                    self.__append(tok, True)
+                    self.__quote = tok
+
+    def flush(self) -> str:
+        stmt = "".join(self.__parts)[self.__start :] if self.__start >= 0 else ""
+        self.__parts = []
+        self.__start = -1
+        self.__size = 0
+        return stmt
+
+
 class FileReader:
-    def __init__(self) -> None:
+    __SAMPLE = 1 << 16
+    __STMTS = (
+        ast.SelectStmt,
+        ast.InsertStmt,
+        ast.UpdateStmt,
+        ast.DeleteStmt,
+        ast.CreateTableAsStmt,
+    )
+
+    def __init__(
+        self, encoding: str = "", encodings: dict[str, str] | None = None
+    ) -> None:
+        self.__encoding = encoding
+        self.__encodings = {} if encodings is None else encodings
         self.__p0 = re.compile("('.*?);(.*?')")
         self.__p1 = re.compile(
-            "(?:with|select|update|insert|delete).+?;", flags=re.DOTALL
+            "(?:with|select|update|insert|delete).+?;", flags=re.DOTALL | re.IGNORECASE
         )
         self.__p2 = re.compile("--.*")
-        self.__p3 = re.compile("/\*.*?\*/", flags=re.DOTALL)
+        self.__p3 = re.compile(r"/\*.*?\*/", flags=re.DOTALL)
+        self.__p4 = re.compile(
+            r"\b(?:with|select|update|insert|delete)\b", flags=re.IGNORECASE
+        )
+
+    def __override(self, path: str) -> str:
+        for ptrn, enc in self.__encodings.items():
+            if fnmatch.fnmatch(path, ptrn) or fnmatch.fnmatch(
+                os.path.basename(path), ptrn
+            ):
+                return enc
+        return self.__encoding
+
+    def __detect_enc(self, b: bytes) -> str:
+        enc = detect(b)["encoding"]
+        if not enc:
+            raise Exception()
+        return "utf-8" if enc == "ascii" else enc
 
-    def __detect_enc(self, path: str) -> str | None:
+    def __decode(self, path: str) -> str:
         with open(path, "rb") as f:
             b = f.read()
-            e = detect(b)
-            return e["encoding"]
+        enc = self.__override(path)
+        if enc:
+            return b.decode(enc)
+        try:
+            return b.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            pass
+        try:
+            return b.decode(self.__detect_enc(b[: FileReader.__SAMPLE]))
+        except UnicodeDecodeError:
+            return b.decode(self.__detect_enc(b))
+
+    def __name(self, path: str) -> str:
+        name, _ = os.path.splitext(os.path.basename(path))
+        return name
 
     def read(self, path: str) -> list[RawStmt]:
-        enc = self.__detect_enc(path)
-        if not enc:
-            raise Exception()
-        with open(path, "r", encoding=enc) as f:
-            s = f.read().lower()
+        s = self.__decode(path)
         s = self.__p0.sub(r"\1\2", s)
         s = self.__p2.sub("", s)
         s = self.__p3.sub("", s)
         sqls = self.__p1.findall(s)
-        name, _ = os.path.splitext(os.path.basename(path))
-        name = name.lower()
+        name = self.__name(path)
         return [RawStmt(name + "-" + str(i + 1), sql) for i, sql in enumerate(sqls)]
+
+    def stream(self, path: str) -> Iterator[RawStmt]:
+        enc = self.__override(path)
+        if not enc:
+            with open(path, "rb") as f:
+                sample = f.read(FileReader.__SAMPLE)
+            try:
+                codecs.getincrementaldecoder("utf-8-sig")().decode(sample)
+                enc = "utf-8-sig"
+            except UnicodeDecodeError:
+                enc = self.__detect_enc(sample)
+
+        name = self.__name(path)
+        n = 0
+        try:
+            with open(path, "r", encoding=enc) as f:
+                for stmt in self.__scan(f, _Scanner(self.__p4)):
+                    n += 1
+                    yield RawStmt(name + "-" + str(n), stmt)
+        except UnicodeDecodeError:
+            if self.__override(path):
+                raise
+            lines = io.StringIO(self.__decode(path))
+            for i, stmt in enumerate(self.__scan(lines, _Scanner(self.__p4))):
+                if i >= n:
+                    yield RawStmt(name + "-" + str(i + 1), stmt)
+
+    def parse(self, path: str) -> list[RawStmt]:
+        s = self.__decode(path)
+        try:
+            psdstmts = parse_sql(s)
+        except ParseError:
+            return list(self.stream(path))
+
+        name = self.__name(path)
+        psdstmts = [ps for ps in psdstmts if isinstance(ps.stmt, FileReader.__STMTS)]
+        stmts: list[RawStmt] = []
+        for i, ps in enumerate(psdstmts):
+            end = ps.stmt_location + ps.stmt_len if ps.stmt_len else len(s)
+            sql = s[ps.stmt_location : end].strip() + ";"
+            stmts.append(RawStmt(name + "-" + str(i + 1), sql, ps.stmt))
+        return stmts
+
+    def prefetch(
+        self,
+        paths: Iterable[str],
+        mode: str = "read",
+        threads: int = 8,
+        depth: int = 64,
+        metrics: Metrics | None = None,
+    ) -> Iterator[Tuple[str, list[RawStmt] | None]]:
+        read = getattr(self, mode)
+
+        def f(path: str) -> list[RawStmt] | None:
+            try:
+                return list(read(path))
+            except Exception:
+                return None
+
+        it = iter(paths)
+        end = object()
+        window: deque[Tuple[str, Future[list[RawStmt] | None]]] = deque()
+        with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+            for path in it:
+                window.append((path, executor.submit(f, path)))
+                if len(window) >= depth:
+                    break
+            while window:
+                path, fut = window.popleft()
+                nxt = next(it, end)
+                if nxt is not end:
+                    window.append((nxt, executor.submit(f, nxt)))
+                with metrics.stage("reading") if metrics else nullcontext():
+                    stmts = fut.result()
+                yield path, stmts
+
+    def __scan(self, lines: Iterator[str], scanner: _Scanner) -> Iterator[str]:
+        for line in lines:
+            yield from scanner.feed(line)
+        rest = scanner.flush()
+        if rest.strip():
+            yield rest
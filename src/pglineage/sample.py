@@ -1,21 +1,24 @@
 from pathlib import Path
 
-import tqdm
-
 from pglineage.analyzer import Analyzer
+from pglineage.metrics import Metrics, progress
 from pglineage.reader import FileReader
 
 files = [str(p) for p in Path("resource").glob("**/*") if p.is_file()]
 reader = FileReader()
-analyzer = Analyzer()
+metrics = Metrics()
+analyzer = Analyzer(metrics)
+
+
+def stream():
+    for file, sqls in progress(
+        reader.prefetch(files, metrics=metrics), "loading", len(files)
+    ):
+        if sqls is None:
+            print("file reading error : " + file)
+            continue
+        yield sqls
 
-for file in tqdm.tqdm(files, desc="loading", leave=False):
-    try:
-        sqls = reader.read(file)
-    except Exception:
-        print("file reading error : " + file)
-        continue
-    analyzer.load(sqls)
 
-lineage = analyzer.analyze()
+lineage = analyzer.analyze(stream=stream())
 lineage.draw(output="output/result", format="jpg")
@@ -0,0 +1,106 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Sequence, Tuple
+
+MAGIC = b"PGLN"
+VERSION = 1
+SECTIONS = (
+    "tblnames",
+    "tblcolptr",
+    "tblcols",
+    "coltbls",
+    "colnms",
+    "tails",
+    "heads",
+    "tbltails",
+    "tblheads",
+    "reftails",
+    "refheads",
+    "nodes",
+)
+_HEADER = struct.Struct("<4sIII" + "I" * len(SECTIONS))
+
+
+def dump(path: str, names: Sequence[str], sections: dict[str, Sequence[int]]) -> None:
+    blob = bytearray()
+    offsets = array("I", [0])
+    for name in names:
+        blob += name.encode("utf-8")
+        offsets.append(len(blob))
+
+    arrays = [array("I", sections[s]) for s in SECTIONS]
+    if sys.byteorder == "big":
+        for a in [offsets, *arrays]:
+            a.byteswap()
+
+    fd, tmp = tempfile.mkstemp(
+        prefix=os.path.basename(path) + ".", dir=os.path.dirname(path) or "."
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                _HEADER.pack(MAGIC, VERSION, len(names), len(blob), *map(len, arrays))
+            )
+            offsets.tofile(f)
+            for a in arrays:
+                a.tofile(f)
+            f.write(blob)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class Snapshot:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self.__buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__views: list[memoryview] = []
+        try:
+            self.names, self.sections = self.__read(path)
+        except BaseException:
+            self.close()
+            raise
+
+    def __view(self, pos: int, n: int) -> Sequence[int]:
+        mv = memoryview(self.__buf)
+        self.__views.append(mv)
+        self.__views.append(mv[pos : pos + n * 4])
+        self.__views.append(self.__views[-1].cast("I"))
+        if sys.byteorder == "big":
+            a = array("I", self.__views[-1])
+            a.byteswap()
+            return a
+        return self.__views[-1]
+
+    def __read(self, path: str) -> Tuple[list[str], dict[str, Sequence[int]]]:
+        buf = self.__buf
+        magic, version, nstr, nblob, *lens = _HEADER.unpack_from(buf)
+        if magic != MAGIC or version != VERSION:
+            raise Exception("unsupported lineage snapshot: " + path)
+
+        pos = _HEADER.size
+        offsets = self.__view(pos, nstr + 1)
+        pos += (nstr + 1) * 4
+        sections: dict[str, Sequence[int]] = {}
+        for s, n in zip(SECTIONS, lens):
+            sections[s] = self.__view(pos, n)
+            pos += n * 4
+
+        blob = buf[pos : pos + nblob]
+        names = [blob[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(nstr)]
+        return names, sections
+
+    def close(self) -> None:
+        for mv in reversed(self.__views):
+            mv.release()
+        self.__views.clear()
+        self.__buf.close()
+
+
+def load(path: str) -> Snapshot:
+    return Snapshot(path)
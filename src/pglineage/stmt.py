@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any
 
 
 @dataclass(frozen=True)
 class RawStmt:
     name: str
     stmt: str
+    psdstmt: Any = field(default=None, compare=False, repr=False)
@@ -1,9 +1,13 @@
+import sys
+
 from pglineage.column import Column
 
 
 class Table:
+    __slots__ = ("name", "columns")
+
     def __init__(self, name: str) -> None:
-        self.name = name
+        self.name = sys.intern(name)
         self.columns: dict[str, None] = {}
 
     def update(self, columns: dict[Column | str, None]) -> None:
@@ -11,7 +15,7 @@ class Table:
             self.add(col)
 
     def add(self, column: Column | str) -> None:
-        k = column if isinstance(column, str) else column.name
+        k = sys.intern(column) if isinstance(column, str) else column.name
         self.columns.setdefault(k)
 
     def __eq__(self, __o: object) -> bool:
@@ -39,3 +39,37 @@ case_subquery_1 = (
     "            ) "
     "    ) AS tbl3 ON tbl2.col3 = tbl3.col3; "
 )
+
+# upsert
+upsert_1 = (
+    "INSERT INTO table4 (col1, col2, col3) "
+    "SELECT col1, col2, col3 FROM table1 "
+    "ON CONFLICT (col1) DO UPDATE SET "
+    "    col2 = EXCLUDED.col2, "
+    "    col3 = table4.col4 "
+    "WHERE table4.col3 < EXCLUDED.col3"
+)
+
+# merge, one arm per command
+merge_1 = (
+    "MERGE INTO table4 AS t "
+    "USING ( "
+    "    SELECT tbl1.col1, tbl1.col2, tbl2.col3 "
+    "    FROM table1 AS tbl1 "
+    "    INNER JOIN table2 AS tbl2 ON tbl1.col1 = tbl2.col1 "
+    ") AS s ON t.col1 = s.col1 "
+    "WHEN MATCHED AND s.col3 IS NULL THEN DELETE "
+    "WHEN MATCHED THEN UPDATE SET col2 = s.col2, col3 = s.col3 "
+    "WHEN NOT MATCHED THEN INSERT (col1, col2) VALUES (s.col1, s.col2)"
+)
+
+# merge, unqualified columns in both arms
+merge_2 = (
+    "MERGE INTO table4 "
+    "USING table1 ON table4.col1 = table1.col1 "
+    "WHEN MATCHED THEN UPDATE SET col2 = col3 "
+    "WHEN NOT MATCHED THEN INSERT (col1, col2) VALUES (col1, col2)"
+)
+
+# update, unqualified column with an aliased target
+update_1 = "UPDATE table4 AS t SET col2 = col3 FROM table1 WHERE t.col1 = table1.col1"
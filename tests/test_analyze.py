@@ -2,11 +2,12 @@ from typing import Any
 
 import sql
 from pglineage.analyzer import Analyzer
+from pglineage.stmt import RawStmt
 
 
 def func(sql: str, expected: dict[str, Any]) -> None:
     analyzer = Analyzer()
-    analyzer.load([("", sql)])
+    analyzer.load([RawStmt("", sql)])
     nd = analyzer._analyze_test()
     result = nd._flatten().format()
     assert result == expected
@@ -30,3 +31,86 @@ def test_case_subquery_1():
         "tgttable": "",
     }
     func(sql.case_subquery_1, expected)
+
+
+def test_upsert_1():
+    expected = {
+        "refcols": {"col1": [], "col2": [], "col3": []},
+        "srccols": {
+            "col1": ["table1.col1"],
+            "col2": ["table1.col2"],
+            "col3": ["table1.col3", "table4.col4"],
+        },
+        "statement": "Insert",
+        "tables": {"table1": "table1", "table4": "table4"},
+        "tgttable": "table4",
+    }
+    func(sql.upsert_1, expected)
+
+
+def test_merge_1():
+    expected = {
+        "refcols": {"col1": [], "col2": [], "col3": []},
+        "srccols": {
+            "col1": ["table1.col1"],
+            "col2": ["table1.col2"],
+            "col3": ["table2.col3"],
+        },
+        "statement": "Merge",
+        "tables": {"table1": "table1", "table2": "table2"},
+        "tgttable": {"t": "table4"},
+    }
+    func(sql.merge_1, expected)
+
+
+def test_merge_2():
+    expected = {
+        "refcols": {"col2": [], "col1": []},
+        "srccols": {
+            "col2": ["table4.col3", "table1.col2"],
+            "col1": ["table1.col1"],
+        },
+        "statement": "Merge",
+        "tables": {"table1": "table1"},
+        "tgttable": {"table4": "table4"},
+    }
+    func(sql.merge_2, expected)
+
+
+def test_update_1():
+    expected = {
+        "refcols": {"col2": []},
+        "srccols": {"col2": ["table4.col3"]},
+        "statement": "Update",
+        "tables": {"table1": "table1"},
+        "tgttable": {"t": "table4"},
+    }
+    func(sql.update_1, expected)
+
+
+def test_parallel():
+    stmts = [
+        RawStmt("etl-%d" % i, sql)
+        for i in range(100)
+        for sql in (
+            "insert into stg%d (a, b) select x, y + %d from raw;" % (i, i),
+            "update mart set c = s.b from stg%d s where s.a = mart.c;" % i,
+            "select from broken%d" % i + " where",
+        )
+    ]
+
+    def run(workers):
+        analyzer = Analyzer()
+        analyzer.load(stmts)
+        results = analyzer.summarize(workers)
+        lineage = analyzer.analyze(workers)
+        return (
+            [
+                (res.rawstmt, bool(res.msg), res.summary and res.summary[3:])
+                for res in results
+            ],
+            lineage.col_edges,
+            sorted(lineage.nodes),
+        )
+
+    assert run(2) == run(1)
@@ -0,0 +1,39 @@
+from pglineage.analyzer import Analyzer
+from pglineage.cache import Cache
+from pglineage.edge import TblEdge
+from pglineage.stmt import RawStmt
+
+
+def test_cache_hit(tmp_path):
+    stmts = [
+        RawStmt("ps1-1", "insert into table4 (col1) select col1 from table1;"),
+        RawStmt("ps1-2", "select from where;"),
+    ]
+
+    cache = Cache(str(tmp_path))
+    analyzer = Analyzer()
+    analyzer.load(stmts)
+    analyzer.analyze(cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    cache = Cache(str(tmp_path))
+    stmt = RawStmt("ps2-1", "insert  into table4 (col1)\nselect col1 from table1;")
+    summary, msg, _ = cache.get(stmt)
+    assert msg == ""
+    assert TblEdge("ps2-1", "table4") in summary.tbl_edges
+    assert TblEdge("table1", "ps2-1") in summary.tbl_edges
+
+    summary, msg, _ = cache.get(stmts[1])
+    assert summary is None and msg
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_cache_source(tmp_path, monkeypatch):
+    stmt = RawStmt("ps1-1", "insert into table4 (col1) select col1 from table1;")
+    analyzer = Analyzer()
+    analyzer.load([stmt])
+    analyzer.analyze(cache=Cache(str(tmp_path)))
+    assert Cache(str(tmp_path)).get(stmt) is not None
+
+    monkeypatch.setattr("pglineage.cache._source", lambda: "changed")
+    assert Cache(str(tmp_path)).get(stmt) is None
@@ -0,0 +1,113 @@
+import pytest
+from pglineage.analyzer import Analyzer
+from pglineage.catalog import Catalog
+from pglineage.column import Column
+from pglineage.stmt import RawStmt
+
+COLUMNS = """table_catalog,table_schema,table_name,column_name,ordinal_position
+db,public,raw,y,2
+db,public,raw,x,1
+db,public,dim,id,1
+db,public,dim,label,2
+db,archive,raw,x,1
+db,public,stg,a,1
+db,public,stg,b,2
+"""
+
+
+def test_catalog(tmp_path):
+    path = tmp_path / "columns.csv"
+    path.write_text(COLUMNS, encoding="utf-8")
+    catalog = Catalog.load(str(path))
+
+    assert list(catalog.columns("raw")) == ["x", "y"]
+    path.write_text('{"raw": ["x", "y"]}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        Catalog.load(str(path))
+    assert catalog.qualify("dim") == "public.dim"
+    assert catalog.qualify("archive.raw") == "archive.raw"
+
+    analyzer = Analyzer(catalog=catalog)
+    analyzer.load(
+        [
+            RawStmt(
+                "etl-1",
+                "insert into stg (a, b) select x, label from raw r "
+                "join dim d on r.x = d.id;",
+            ),
+            RawStmt("etl-2", "insert into stg (a) select * from archive.raw;"),
+            RawStmt(
+                "etl-3",
+                "merge into mart using dim on mart.k = dim.id "
+                "when matched then update set v = label "
+                "when not matched then insert (k, v) values (id, label);",
+            ),
+        ]
+    )
+    lineage = analyzer.analyze()
+
+    assert lineage.upstream_columns("public.stg", "a") == {
+        Column("public.raw", "x"),
+        Column("archive.raw", "x"),
+    }
+    assert lineage.upstream_columns("public.stg", "b") == {
+        Column("public.dim", "label")
+    }
+    assert lineage.upstream_columns("mart", "v") == {Column("public.dim", "label")}
+    assert lineage.upstream_columns("mart", "k") == {Column("public.dim", "id")}
+
+    assert catalog.qualify("public.x") == catalog.qualify("x") == "x"
+    assert catalog.qualify("archive.x") == "archive.x"
+    analyzer = Analyzer(catalog=catalog)
+    analyzer.load(
+        [
+            RawStmt("etl-4", "insert into public.x (a) select a from s;"),
+            RawStmt("etl-5", "insert into y (a) select a from x;"),
+        ]
+    )
+    assert analyzer.analyze().upstream_columns("y", "a") == {
+        Column("x", "a"),
+        Column("s", "a"),
+    }
+
+
+def test_public_schema():
+    analyzer = Analyzer()
+    analyzer.load(
+        [
+            RawStmt("etl-1", "insert into public.stg (a) select x from raw;"),
+            RawStmt("etl-2", "insert into mart (c) select s.a from stg s;"),
+            RawStmt("etl-3", "insert into archive.stg (a) select c from public.mart;"),
+        ]
+    )
+    lineage = analyzer.analyze()
+
+    assert "public.stg" not in lineage.tables
+    assert lineage.upstream_columns("archive.stg", "a") == {
+        Column("mart", "c"),
+        Column("stg", "a"),
+        Column("raw", "x"),
+    }
+
+
+def test_star_expansion():
+    analyzer = Analyzer()
+    analyzer.load(
+        [
+            RawStmt("etl-1", "insert into mart select * from stg;"),
+            RawStmt("etl-2", "insert into stg select * from raw;"),
+            RawStmt("etl-3", "insert into raw (x, y) select a, b from src;"),
+            RawStmt("etl-4", "create table stg as select x as p, y as q from raw;"),
+        ]
+    )
+    lineage = analyzer.analyze()
+
+    assert lineage.upstream_columns("stg", "q") == {
+        Column("raw", "y"),
+        Column("src", "b"),
+    }
+    assert lineage.upstream_columns("mart", "p") == {
+        Column("stg", "p"),
+        Column("raw", "x"),
+        Column("src", "a"),
+    }
@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+from pglineage.cli import main
+
+
+def test_cli(tmp_path):
+    src = tmp_path / "sql"
+    (src / "etl").mkdir(parents=True)
+    (src / "etl" / "load.sql").write_text(
+        "insert into stg (a) select x from raw;\n"
+        "insert into mart (c) select a from stg;\n",
+        encoding="utf-8",
+    )
+    (src / "etl" / "broken.sql").write_text(
+        "insert into mart (c) selec a from stg;\n", encoding="utf-8"
+    )
+    (src / "notes.txt").write_text("select 1;\n", encoding="utf-8")
+    output = str(tmp_path / "out" / "result")
+
+    argv = [str(src), "-i", "*.sql", "-o", output, "-j", "1", "--no-progress"]
+    assert main(argv + ["-x", "*/broken.sql", "-e", "json", "-e", "csv"]) == 0
+    with open(output + ".json", encoding="utf-8") as f:
+        assert len(json.load(f)["statements"]) == 2
+    with open(output + ".metrics.json", encoding="utf-8") as f:
+        stats = json.load(f)
+    assert stats["statements"]["count"] == 2
+    assert stats["stages"]["reading"]["calls"] == 1
+
+    assert main(argv + ["--max-failures", "0"]) == 1
+    assert main(argv + ["--max-failures", "1"]) == 0
+
+
+def test_cli_project(tmp_path, capsys):
+    src = tmp_path / "sql"
+    src.mkdir()
+    (src / "load.sql").write_text(
+        "insert into stg (a) select x from raw;\n", encoding="utf-8"
+    )
+    (src / "broken.sql").write_text(
+        "insert into mart (c) selec a from stg;\n", encoding="utf-8"
+    )
+    output = str(tmp_path / "out" / "result")
+    argv = [str(src), "-o", output, "-j", "1", "--no-progress", "-e", "json"]
+    argv += ["--project", str(tmp_path / "state")]
+
+    assert main(argv + ["--max-failures", "0"]) == 1
+    assert "failures: 1" in capsys.readouterr().err
+
+    (src / "mart.sql").write_text(
+        "insert into mart (c) select a from stg;\n", encoding="utf-8"
+    )
+    assert main(argv) == 0
+    assert "statements: 3, failures: 1" in capsys.readouterr().err
+    with open(output + ".json", encoding="utf-8") as f:
+        assert len(json.load(f)["statements"]) == 2
+    assert os.path.exists(tmp_path / "state" / "manifest.json")
+
+
+def test_cli_encoding_for(capsys):
+    with pytest.raises(SystemExit):
+        main(["--encoding-for", "latin-1"])
+    assert "--encoding-for expects GLOB=ENCODING" in capsys.readouterr().err
@@ -0,0 +1,78 @@
+import json
+import pickle
+
+import pytest
+import sql
+from pglineage.analyzer import Analyzer
+from pglineage.column import Column
+from pglineage.compact import ColEdges
+from pglineage.export import FORMATS, LEVELS
+from pglineage.lineage import Lineage
+from pglineage.stmt import RawStmt
+
+
+def summaries():
+    sqls = [v for k, v in vars(sql).items() if isinstance(v, str) and k[0] != "_"]
+    sqls += [
+        "insert into stg (a, b) select x, y from raw;",
+        "insert into mart (c) select a from stg;",
+        "update mart set c = s.b from stg s where s.a = mart.c;",
+        "delete from stg using raw where raw.x = stg.a;",
+    ]
+    analyzer = Analyzer()
+    analyzer.load(rawstmts(sqls))
+    return [(res.rawstmt, res.summary) for res in analyzer.summarize() if res.summary]
+
+
+def rawstmts(sqls: list[str]) -> list[RawStmt]:
+    return [RawStmt("compact-" + str(i + 1), s) for i, s in enumerate(sqls)]
+
+
+def exports(lineage: Lineage, directory) -> dict[str, list[str]]:
+    res = {}
+    for fmt in FORMATS:
+        for level in LEVELS if fmt in ("csv", "dot") else LEVELS[:1]:
+            path = str(directory / (level + "." + fmt))
+            lineage.export(path, fmt, level)
+            with open(path, encoding="utf-8") as f:
+                if fmt == "json":
+                    data = json.load(f)
+                    lines = [k + json.dumps(v) for k, vs in data.items() for v in vs]
+                else:
+                    lines = f.read().splitlines()
+            res[path.rsplit("/", 1)[1]] = sorted(lines)
+    return res
+
+
+def test_compact(tmp_path):
+    ss = summaries()
+    default = Lineage.create(ss)
+    compact = Lineage.create(ss, compact=True)
+
+    assert isinstance(compact.col_edges, ColEdges)
+    assert len(default.col_edges) > 0
+    assert len(compact.col_edges) == len(default.col_edges)
+    assert set(compact.col_edges) == default.col_edges
+    assert all(e in compact.col_edges for e in default.col_edges)
+    assert {k: list(v.columns) for k, v in compact.tables.items()} == {
+        k: list(v.columns) for k, v in default.tables.items()
+    }
+    assert compact.tbl_edges == default.tbl_edges
+    assert compact.ref_edges == default.ref_edges
+    assert compact.nodes == default.nodes
+
+    (tmp_path / "default").mkdir()
+    (tmp_path / "compact").mkdir()
+    assert exports(compact, tmp_path / "compact") == exports(
+        default, tmp_path / "default"
+    )
+
+
+def test_column_immutable():
+    col = Column("t", "a")
+    with pytest.raises(AttributeError):
+        col.table = "u"
+    assert Column("", "a").with_table("t") == col
+    assert col.with_table("u") is col
+    assert col.replace_table("t", "u") == Column("u", "a")
+    assert pickle.loads(pickle.dumps(col)) == col
@@ -0,0 +1,252 @@
+import csv
+import json
+import os
+import re
+from functools import partial
+from xml.etree import ElementTree
+
+import pytest
+
+from pglineage import export
+from pglineage.analyzer import Analyzer
+from pglineage.column import Column
+from pglineage.edge import ColEdge
+from pglineage.graph import Graph
+from pglineage.lineage import Lineage
+from pglineage.stmt import RawStmt
+
+
+def analyzer():
+    analyzer = Analyzer()
+    analyzer.load(
+        [
+            RawStmt("etl-1", "insert into stg (a, b) select x, y from raw;"),
+            RawStmt("etl-2", "insert into mart (c) select a from stg;"),
+            RawStmt("etl-3", "update mart set c = s.b from stg s where s.a = mart.c;"),
+        ]
+    )
+    return analyzer
+
+
+def create():
+    return analyzer().analyze()
+
+
+def summaries():
+    return [(res.rawstmt, res.summary) for res in analyzer().summarize()]
+
+
+def test_query():
+    lineage = create()
+
+    assert lineage.upstream_columns("mart", "c") == {
+        Column("stg", "a"),
+        Column("stg", "b"),
+        Column("raw", "x"),
+        Column("raw", "y"),
+    }
+    assert lineage.downstream_columns("raw", "y") == {
+        Column("stg", "b"),
+        Column("mart", "c"),
+    }
+    assert lineage.upstream_tables("mart") == {"stg", "raw"}
+    assert lineage.downstream_tables("raw") == {"stg", "mart"}
+    assert lineage.column_path(Column("raw", "x"), Column("mart", "c")) == [
+        Column("raw", "x"),
+        Column("stg", "a"),
+        Column("mart", "c"),
+    ]
+    assert lineage.column_path(Column("mart", "c"), Column("raw", "x")) == []
+    assert sorted(lineage.writers("mart")) == ["etl-2", "etl-3"]
+
+
+def test_save_load(tmp_path):
+    lineage = create()
+    path = str(tmp_path / "lineage.pgln")
+    lineage.save(path)
+    loaded = Lineage.load(path)
+
+    assert {k: list(v.columns) for k, v in loaded.tables.items()} == {
+        k: list(v.columns) for k, v in lineage.tables.items()
+    }
+    assert set(loaded.col_edges) == lineage.col_edges
+    assert loaded.tbl_edges == lineage.tbl_edges
+    assert loaded.ref_edges == lineage.ref_edges
+    assert loaded.nodes == lineage.nodes
+    assert loaded.upstream_columns("mart", "c") == lineage.upstream_columns("mart", "c")
+
+    with pytest.raises(ValueError):
+        loaded.patch([], [])
+    assert set(loaded.col_edges) == lineage.col_edges
+    assert loaded.nodes == lineage.nodes
+
+    loaded.save(path)
+    assert set(loaded.col_edges) == lineage.col_edges
+    assert loaded.upstream_tables("mart") == {"stg", "raw"}
+    loaded.close()
+    assert set(loaded.col_edges) == lineage.col_edges
+
+    with Lineage.load(path) as reloaded:
+        assert set(reloaded.col_edges) == lineage.col_edges
+        assert reloaded.nodes == lineage.nodes
+    assert len(reloaded.col_edges) == len(lineage.col_edges)
+
+    compact = Lineage.create(summaries(), compact=True)
+    n = len(compact.col_edges.symbols)
+    compact.save(path)
+    assert len(compact.col_edges.symbols) == n
+    assert os.listdir(tmp_path) == ["lineage.pgln"]
+
+
+def test_export(tmp_path):
+    lineage = create()
+
+    path = str(tmp_path / "lineage.json")
+    lineage.export(path, "json")
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["statements"] == [{"name": nd} for nd in lineage.nodes]
+    assert len(data["column_edges"]) == len(lineage.col_edges)
+    assert data["ref_edges"] == []
+
+    Lineage.create([]).export(path, "json")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {sec: [] for sec in export.SECTIONS}
+
+    path = str(tmp_path / "lineage.ndjson")
+    lineage.export(path, "ndjson")
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert sum(r["type"] == "table_edges" for r in records) == len(lineage.tbl_edges)
+
+    path = str(tmp_path / "lineage.csv")
+    lineage.export(path, "csv")
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["tail_table", "tail_column", "head_table", "head_column"]
+    assert {ColEdge(Column(r[0], r[1]), Column(r[2], r[3])) for r in rows[1:]} == (
+        lineage.col_edges
+    )
+
+    path = str(tmp_path / "lineage.graphml")
+    lineage.export(path, "graphml")
+    assert ElementTree.parse(path).getroot().tag.endswith("graphml")
+
+    path = str(tmp_path / "lineage.dot")
+    lineage.export(path, "dot", "table")
+    with open(path, encoding="utf-8") as f:
+        assert '"stg" -> "etl-2"' in f.read()
+
+
+def test_sources():
+    lineage = create()
+
+    assert lineage.sources("mart", "c") == {Column("raw", "x"), Column("raw", "y")}
+    assert lineage.sources("raw", "x") == {Column("raw", "x")}
+
+    graph = Graph([("a", "b"), ("b", "c"), ("c", "b"), ("c", "d"), ("e", "d")])
+    assert graph.sources("d") == {"a", "e"}
+    assert Graph([("a", "b"), ("b", "a")]).sources("a") == {"a", "b"}
+
+
+def escaped():
+    analyzer = Analyzer()
+    analyzer.load(
+        [
+            RawStmt(
+                "esc-1",
+                'insert into "a.b" ("c", "x\\") select "q""r", w from "s\\""t";',
+            ),
+            RawStmt("esc-2", 'insert into a ("b.c") select "q""r" from "s\\""t";'),
+        ]
+    )
+    return analyzer.analyze()
+
+
+def test_export_escape(tmp_path):
+    lineage = escaped()
+    assert Column("a.b", "x\\") in {e.head for e in lineage.col_edges}
+
+    path = str(tmp_path / "lineage.dot")
+    lineage.export(path, "dot", "column")
+    q = r'"((?:[^"\\]|\\.)*)"'
+    edge = re.compile(r"\t" + q + ":" + q + " -> " + q + ":" + q + "\n")
+    with open(path, encoding="utf-8") as f:
+        lines = [ln for ln in f if " -> " in ln]
+    assert all(edge.fullmatch(ln) for ln in lines)
+    unquote = partial(re.compile(r"\\(.)").sub, r"\1")
+    assert {
+        ColEdge(*(Column(*map(unquote, m[i : i + 2])) for i in (0, 2)))
+        for m in (edge.fullmatch(ln).groups() for ln in lines)
+    } == lineage.col_edges
+
+    path = str(tmp_path / "lineage.graphml")
+    lineage.export(path, "graphml")
+    ns = "{http://graphml.graphdrawing.org/xmlns}"
+    graph = ElementTree.parse(path).getroot().find(ns + "graph")
+    ids = [nd.get("id") for nd in graph.iter(ns + "node")]
+    assert len(ids) == len(set(ids))
+    assert len(ids) == len(lineage.tables) + len(lineage.nodes) + sum(
+        len(tbl.columns) for tbl in lineage.tables.values()
+    )
+    assert all(
+        e.get("source") in ids and e.get("target") in ids
+        for e in graph.iter(ns + "edge")
+    )
+
+
+def rendered(monkeypatch):
+    sources = {}
+
+    class Source:
+        def __init__(self, source, format):
+            self.source = source
+
+        def render(self, output):
+            sources[output] = self.source
+
+    monkeypatch.setattr("pglineage.lineage.gv.Source", Source)
+    return sources
+
+
+def test_draw_escape(tmp_path, monkeypatch):
+    sources = rendered(monkeypatch)
+    output = str(tmp_path / "result")
+    escaped().draw(output, views=("column", "table"))
+
+    clv = sources[output + ".clv"]
+    assert r'"a.b" [label="<c> c|<x\\\\> x\\\\" shape=record' in clv
+    assert r'"s\\\"t":"w" -> "a.b":"x\\"' + "\n" in clv
+    assert r'"s\\\"t" -> "esc-1"' + "\n" in sources[output + ".tlv"]
+
+
+def test_draw_partition(tmp_path, monkeypatch):
+    sources = rendered(monkeypatch)
+    az = analyzer()
+    az.load([RawStmt("etl-4", "insert into other (z) select w from src;")])
+    lineage = az.analyze()
+    output = str(tmp_path / "result")
+
+    lineage.draw(output, views=("table",), partition="component")
+    assert sorted(sources) == [output + "-1.tlv", output + "-2.tlv"]
+    first, second = sources[output + "-1.tlv"], sources[output + "-2.tlv"]
+    for nm in ("raw", "stg", "mart", "etl-1", "etl-3"):
+        assert '"%s"' % nm in first and '"%s"' % nm not in second
+    for nm in ("src", "other", "etl-4"):
+        assert '"%s"' % nm in second and '"%s"' % nm not in first
+
+    sources.clear()
+    lineage.draw(output, views=("table",), tables=["raw"])
+    assert list(sources) == [output + ".tlv"]
+    for nm in ("raw", "etl-1", "stg"):
+        assert '"%s"' % nm in sources[output + ".tlv"]
+    for nm in ("etl-2", "mart", "other"):
+        assert '"%s"' % nm not in sources[output + ".tlv"]
+
+    lineage.draw(output, views=("table",), tables=["raw"], hops=2)
+    for nm in ("etl-2", "etl-3", "mart"):
+        assert '"%s"' % nm in sources[output + ".tlv"]
+    assert '"other"' not in sources[output + ".tlv"]
+
+    with pytest.raises(ValueError):
+        lineage.draw(output, partition="components")
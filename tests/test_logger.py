@@ -0,0 +1,27 @@
+import csv
+
+from pglineage.logger import Logger
+from pglineage.stmt import RawStmt
+
+
+def test_logger(tmp_path):
+    logger = Logger(buffer=2)
+    other = Logger()
+    for name, result in [("c", "success"), ("a", "failed"), ("b", "success")]:
+        logger.set(result, "", RawStmt(name, "select   1;\n" * 20))
+    logger.set("success", "", RawStmt("a", "select 1;"))
+    other.set("failed", "error", RawStmt("z", "select 1;"))
+
+    path = str(tmp_path / "result.log")
+    logger.write(path)
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.reader(f))[1:]
+
+    assert [row[:2] for row in rows] == [
+        ["a", "success"],
+        ["b", "success"],
+        ["c", "success"],
+    ]
+    assert len(rows[1][3]) == 84
+    assert [row.name for row in other.rows()] == ["z"]
+    logger.close()
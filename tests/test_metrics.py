@@ -0,0 +1,46 @@
+import os
+
+from pglineage.analyzer import Analyzer
+from pglineage.metrics import Metrics
+from pglineage.stmt import RawStmt
+
+
+def test_metrics(tmp_path):
+    metrics = Metrics(slowest=1, profile=str(tmp_path / "profile"))
+    analyzer = Analyzer(metrics)
+    analyzer.load(
+        [
+            RawStmt(
+                "etl-1", "insert into stg (a) select x from (select x from raw) r;"
+            ),
+            RawStmt("etl-2", "insert into mart (c) selec a from stg;"),
+        ]
+    )
+    analyzer.analyze()
+
+    assert metrics.statements == 2
+    assert metrics.max_depth == 2
+    assert sum(metrics.failures.values()) == 1
+    assert len(metrics.slowest()) == 1
+    assert {"analyzing", "creating"} <= set(metrics.stages)
+    assert sorted(os.listdir(tmp_path / "profile")) == ["etl-1.prof", "etl-2.prof"]
+
+    metrics.write(str(tmp_path / "metrics.json"))
+    assert os.path.getsize(tmp_path / "metrics.json")
+
+
+def test_dedup():
+    metrics = Metrics()
+    analyzer = Analyzer(metrics)
+    analyzer.load(
+        [
+            RawStmt("dev-1", "insert into stg (a) select x from raw;"),
+            RawStmt("prd-1", "insert  into stg (a)\n  select x from raw;"),
+            RawStmt("prd-2", "insert into mart (c) select a from stg;"),
+        ]
+    )
+    lineage = analyzer.analyze()
+
+    assert (metrics.statements, metrics.duplicates) == (2, 1)
+    assert metrics.dedup_ratio() == 1 / 3
+    assert sorted(lineage.writers("stg")) == ["dev-1", "prd-1"]
@@ -0,0 +1,47 @@
+from pglineage import node
+from pglineage.column import Column
+
+
+def test_select_memo():
+    inner = node.Select({"a": [Column("t", "x")]}, {"a": []}, {"t": "raw"})
+    outer = node.Select({"b": [Column("q", "a")]}, {"b": [Column("q", "a")]})
+    outer.tables = {"q": inner}
+
+    flat = outer._flatten()
+    assert flat is outer._flatten()
+    assert flat.srccols == {"b": [Column("raw", "x")]}
+    assert flat.tables == {"raw": "raw"}
+
+    traced: list[Column] = []
+    inner._trace_column("a", 1, traced)
+    traced.append(Column("other", "y"))
+    again: list[Column] = []
+    inner._trace_column("a", 1, again)
+    assert again == [Column("raw", "x")]
+
+    inner.srccols = {"a": [c.replace_table("t", "u") for c in inner.srccols["a"]]}
+    inner.tables["u"] = "stg"
+    for nd in (inner, outer):
+        nd._invalidate()
+    flat = outer._flatten()
+    assert flat.srccols == {"b": [Column("stg", "x")]}
+    assert set(flat.tables) == {"raw", "stg"}
+
+
+def test_memo_in_analysis():
+    from pglineage.analyzer import Analyzer
+    from pglineage.stmt import RawStmt
+
+    analyzer = Analyzer()
+    analyzer.load(
+        [
+            RawStmt(
+                "memo-1",
+                "with c as (select x, y from raw) "
+                "insert into t (a, b) select c1.x, c2.y from c c1 join c c2 on true;",
+            ),
+        ]
+    )
+    lineage = analyzer.analyze()
+    assert lineage.upstream_columns("t", "a") == {Column("raw", "x")}
+    assert lineage.upstream_columns("t", "b") == {Column("raw", "y")}
@@ -0,0 +1,122 @@
+from pglineage.analyzer import Analyzer
+from pglineage.column import Column
+from pglineage.lineage import Lineage
+from pglineage.project import Project
+from pglineage.reader import FileReader
+from pglineage.stmt import RawStmt
+
+
+class CountingReader(FileReader):
+    def __init__(self):
+        super().__init__()
+        self.paths = []
+
+    def read(self, path):
+        self.paths.append(path)
+        return super().read(path)
+
+
+def snapshot(lineage: Lineage):
+    return (
+        {k: set(v.columns) for k, v in lineage.tables.items()},
+        set(lineage.col_edges),
+        set(lineage.tbl_edges),
+        set(lineage.ref_edges),
+        sorted(lineage.nodes),
+    )
+
+
+def scratch(files):
+    analyzer = Analyzer()
+    for path in files:
+        analyzer.load(FileReader().read(path))
+    return analyzer.analyze()
+
+
+def test_update(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    etl, mart = src / "etl.sql", src / "mart.sql"
+    etl.write_text(
+        "insert into stg (a, b) select x, y from raw;"
+        "update stg set b = d.label from dim d where d.id = stg.a;",
+        encoding="utf-8",
+    )
+    files = [str(etl)]
+
+    reader = CountingReader()
+    project = Project(str(tmp_path / "state"), reader)
+    lineage = project.update(files)
+    assert snapshot(lineage) == snapshot(scratch(files))
+
+    mart.write_text("insert into mart (c) select a from stg;", encoding="utf-8")
+    files.append(str(mart))
+    reader.paths.clear()
+    lineage = project.update(files)
+    assert reader.paths == [str(mart)]
+    assert snapshot(lineage) == snapshot(scratch(files))
+
+    mart.write_text(
+        "insert into mart (c, e) select b, z from stg join ext using (a);",
+        encoding="utf-8",
+    )
+    reader.paths.clear()
+    lineage = project.update(files)
+    assert reader.paths == [str(mart)]
+    assert snapshot(lineage) == snapshot(scratch(files))
+    assert "ext" in lineage.tables
+
+    files.remove(str(etl))
+    reader.paths.clear()
+    lineage = project.update(files)
+    assert reader.paths == []
+    assert snapshot(lineage) == snapshot(scratch(files))
+    assert "raw" not in lineage.tables
+
+    restored = Project(str(tmp_path / "state"), reader).update(files)
+    assert reader.paths == []
+    assert snapshot(restored) == snapshot(lineage)
+
+
+def test_restore(tmp_path, monkeypatch):
+    path = tmp_path / "etl.sql"
+    path.write_text("insert into stg (a) select x from raw;", encoding="utf-8")
+    files = [str(path)]
+    state = tmp_path / "state"
+    reader = CountingReader()
+    expected = snapshot(Project(str(state), reader).update(files))
+
+    reader.paths.clear()
+    Project(str(state), reader).update(files)
+    assert reader.paths == []
+
+    monkeypatch.setattr("pglineage.cache._source", lambda: "changed")
+    assert snapshot(Project(str(state), reader).update(files)) == expected
+    assert reader.paths == files
+
+    reader.paths.clear()
+    results = state / "results.pickle"
+    results.write_bytes(results.read_bytes()[:10])
+    assert snapshot(Project(str(state), reader).update(files)) == expected
+    assert reader.paths == files
+
+
+def test_patch_compact():
+    analyzer = Analyzer()
+    analyzer.load(
+        [
+            RawStmt("etl-1", "insert into stg (a, b) select x, y from raw;"),
+            RawStmt("etl-2", "insert into mart (c) select a from stg;"),
+            RawStmt("etl-3", "insert into mart (c) select b from stg;"),
+        ]
+    )
+    summaries = [(res.rawstmt, res.summary) for res in analyzer.summarize()]
+
+    lineage = Lineage.create(summaries[:2], compact=True)
+    lineage.patch(["etl-2"], summaries[2:])
+    expected = Lineage.create([summaries[0], summaries[2]], compact=True)
+    assert snapshot(lineage) == snapshot(expected)
+    assert lineage.upstream_columns("mart", "c") == {
+        Column("stg", "b"),
+        Column("raw", "y"),
+    }
@@ -0,0 +1,136 @@
+import threading
+import time
+
+from pglineage.analyzer import Analyzer
+from pglineage.column import Column
+from pglineage.metrics import Metrics
+from pglineage.reader import FileReader
+from pglineage.stmt import RawStmt
+
+
+def test_stream(tmp_path):
+    path = tmp_path / "Load.sql"
+    path.write_text(
+        "-- header; comment\n"
+        "INSERT INTO t (a) SELECT 'x;y''z' FROM s; /* a; /* b; */ c; */\n"
+        "CREATE FUNCTION f() RETURNS int AS $body$ SELECT 1; $body$ LANGUAGE sql;\n"
+        'UPDATE t SET a = "B;c".d\n'
+        'FROM "B;c";\n'
+        "SELECT a FROM t",
+        encoding="utf-8",
+    )
+    assert list(FileReader().stream(str(path))) == [
+        RawStmt("Load-1", "INSERT INTO t (a) SELECT 'x;y''z' FROM s;"),
+        RawStmt("Load-2", 'UPDATE t SET a = "B;c".d\nFROM "B;c";'),
+        RawStmt("Load-3", "SELECT a FROM t"),
+    ]
+
+
+def test_parse(tmp_path):
+    path = tmp_path / "load.sql"
+    path.write_text(
+        "INSERT INTO t (a) SELECT 'x;y' FROM s;\n"
+        "CREATE TABLE x (a int);\n"
+        "CREATE TABLE y AS SELECT a FROM t;",
+        encoding="utf-8",
+    )
+    stmts = FileReader().parse(str(path))
+    assert stmts == [
+        RawStmt("load-1", "INSERT INTO t (a) SELECT 'x;y' FROM s;"),
+        RawStmt("load-2", "CREATE TABLE y AS SELECT a FROM t;"),
+    ]
+    assert all(stmt.psdstmt is not None for stmt in stmts)
+
+
+def test_encoding(tmp_path):
+    (tmp_path / "bom.sql").write_bytes(
+        b"\xef\xbb\xbfinsert into t (a) select '\xc3\xa9' from s;"
+    )
+    (tmp_path / "legacy.sql").write_bytes(b"insert into t (a) select '\xe9' from s;")
+
+    expected = [RawStmt("bom-1", "insert into t (a) select 'é' from s;")]
+    assert FileReader().read(str(tmp_path / "bom.sql")) == expected
+    assert list(FileReader().stream(str(tmp_path / "bom.sql"))) == expected
+
+    reader = FileReader("utf-8", {"legacy*.sql": "latin-1"})
+    assert reader.read(str(tmp_path / "legacy.sql")) == [
+        RawStmt("legacy-1", "insert into t (a) select 'é' from s;")
+    ]
+
+
+def test_case(tmp_path):
+    path = tmp_path / "orders.sql"
+    path.write_text(
+        'INSERT INTO "Orders" ("OrderID", Note) SELECT ID, \'Keep\' FROM Src;',
+        encoding="utf-8",
+    )
+    for stmts in (
+        FileReader().read(str(path)),
+        list(FileReader().stream(str(path))),
+        FileReader().parse(str(path)),
+    ):
+        analyzer = Analyzer()
+        analyzer.load(stmts)
+        lineage = analyzer.analyze()
+        assert "'Keep'" in stmts[0].stmt
+        assert lineage.upstream_columns("Orders", "OrderID") == {Column("src", "id")}
+
+
+def test_prefetch(tmp_path):
+    paths = []
+    for i in range(20):
+        path = tmp_path / ("f%02d.sql" % i)
+        path.write_text(
+            "insert into t%d (a) select a from s%d;" % (i, i), encoding="utf-8"
+        )
+        paths.append(str(path))
+    paths.append(str(tmp_path / "missing.sql"))
+
+    fetched = list(FileReader().prefetch(paths, threads=4, depth=3))
+    assert [path for path, _ in fetched] == paths
+    assert fetched[-1][1] is None
+
+    stream = (stmts for _, stmts in fetched if stmts is not None)
+    results = Analyzer().summarize(2, stream=stream)
+    assert [res.rawstmt.name for res in results] == ["f%02d-1" % i for i in range(20)]
+    assert all(res.summary and not res.msg for res in results)
+
+
+def test_prefetch_depth(tmp_path):
+    lock = threading.Lock()
+    started = []
+
+    class Reader(FileReader):
+        def read(self, path):
+            with lock:
+                started.append(path)
+            return super().read(path)
+
+    paths = []
+    for i in range(12):
+        path = tmp_path / ("f%02d.sql" % i)
+        path.write_text("select a from s%d;" % i, encoding="utf-8")
+        paths.append(str(path))
+
+    metrics = Metrics()
+    outstanding = []
+    for i, _ in enumerate(
+        Reader().prefetch(paths, threads=8, depth=3, metrics=metrics)
+    ):
+        time.sleep(0.01)
+        with lock:
+            outstanding.append(len(started) - (i + 1))
+    assert max(outstanding) == 3
+    assert outstanding[-1] == 0
+    assert metrics.stages["reading"]["calls"] == len(paths)
+
+
+def test_encoding_fallback(tmp_path):
+    path = tmp_path / "late.sql"
+    head = b"".join(b"insert into t%d (a) select a from s;\n" % i for i in range(3000))
+    path.write_bytes(head + b"insert into u (a) select '\xe9' from s;\n")
+
+    stmts = list(FileReader().stream(str(path)))
+    assert stmts == FileReader().read(str(path))
+    assert len(stmts) == 3001
+    assert stmts[-1] == RawStmt("late-3001", "insert into u (a) select 'é' from s;")